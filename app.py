@@ -3,11 +3,8 @@ import streamlit as st
 from dotenv import load_dotenv
 load_dotenv()
 
-from ui_components.uploader import render_uploader
-from ui_components.search import render_search
-from ui_components.list_all import render_list_all
-from graph.graph import app as resume_graph_app
-
+# Each view's module is imported only when the view is shown, so the first page renders
+# without loading the database driver, the document parsers or LangChain up front.
 
 # --- Main Streamlit Application ---
 
@@ -57,25 +54,24 @@ with st.sidebar:
 # The main area of the app will render a different component based
 # on the value of st.session_state.active_view.
 
-# Initialize session state for status messages used by the uploader graph
-if 'status_messages' not in st.session_state:
-    st.session_state.status_messages = []
-
 # Conditionally render the selected view
 if st.session_state.active_view == "uploader":
     st.title("AI-Powered Resume Analysis")
-    st.markdown("Upload a resume (PDF, DOCX, TXT) to automatically extract key information and save it to the database.")
+    st.markdown("Upload one or more resumes (PDF, DOCX, TXT) to automatically extract key information and save it to the database. Files are processed in the background, so you can keep uploading.")
     st.markdown("---")
-    render_uploader(resume_graph_app)
+    from ui_components.uploader import render_uploader
+    render_uploader()
 
 elif st.session_state.active_view == "search":
     st.title("Search Existing Profiles")
-    st.markdown("Find a specific profile in the database by searching for their email address.")
+    st.markdown("Find profiles in the database by email, or by name, skills, employer and institution.")
     st.markdown("---")
+    from ui_components.search import render_search
     render_search()
 
 elif st.session_state.active_view == "list_all":
     st.title("Browse All Profiles")
     st.markdown("View a list of all the professor profiles currently stored in the database.")
     st.markdown("---")
+    from ui_components.list_all import render_list_all
     render_list_all()
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Synthetic resume corpus for the benchmarks.
+
+Usage:
+    uv run python -m benchmarks.corpus ./bench_corpus --count 200 --seed 7
+
+Generates PDF, DOCX and TXT resumes of varying length (1 to ~40 pages) and
+hyperlink density, plus a small share of non-resume documents.
+"""
+import os
+import sys
+import random
+import argparse
+import fitz  # PyMuPDF library
+from docx import Document
+
+FIRST_NAMES = ["Ada", "Alan", "Grace", "Linus", "Barbara", "Donald", "Margaret", "Ken", "Frances", "Dennis"]
+LAST_NAMES = ["Lovelace", "Turing", "Hopper", "Torvalds", "Liskov", "Knuth", "Hamilton", "Thompson", "Allen", "Ritchie"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises", "Hooli"]
+TITLES = ["Software Engineer", "Data Scientist", "Research Fellow", "Assistant Professor", "ML Engineer"]
+SKILLS = ["Python", "SQL", "Java", "Go", "Rust", "Kubernetes", "PyTorch", "Spark"]
+UNIVERSITIES = ["MIT", "Stanford University", "ETH Zurich", "IIT Bombay", "University of Toronto"]
+FILLER = ("Designed and shipped distributed systems, mentored engineers, and published results on "
+          "large-scale data processing, evaluation methodology and reproducible research.")
+
+# Pages per document: mostly short resumes with a long tail of academic CVs.
+LENGTH_PROFILE = [(1, 0.5), (2, 0.25), (5, 0.15), (20, 0.07), (40, 0.03)]
+FORMATS = [("pdf", 0.6), ("docx", 0.25), ("txt", 0.15)]
+NON_RESUME_SHARE = 0.05
+LINES_PER_PAGE = 45
+
+
+def _weighted(rng: random.Random, options: list):
+    return rng.choices([value for value, _ in options], weights=[weight for _, weight in options])[0]
+
+
+def resume_lines(rng: random.Random, index: int, pages: int) -> tuple:
+    """Returns the text lines of one resume and the URLs it links to."""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    handle = f"{first.lower()}{last.lower()}{index}"
+    links = [f"https://www.linkedin.com/in/{handle}", f"https://github.com/{handle}"]
+    links += [f"https://{handle}.dev/project-{n}" for n in range(rng.randint(0, 8))]
+
+    lines = [f"{first} {last}", f"{handle}@example.com | +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+             "", "Summary", FILLER, "", "Skills", ", ".join(rng.sample(SKILLS, 4)), "", "Experience"]
+    year = 2024
+    while len(lines) < pages * LINES_PER_PAGE - 8:
+        start = year - rng.randint(1, 4)
+        lines += [f"{rng.choice(TITLES)} | {rng.choice(COMPANIES)} | {start} - {year}", FILLER, ""]
+        year = start
+    lines += ["Education", f"PhD, Computer Science, {rng.choice(UNIVERSITIES)}, {year}",
+              f"B.Sc., Mathematics, {rng.choice(UNIVERSITIES)}, {year - 4}"]
+    return lines, links
+
+
+def non_resume_lines(rng: random.Random, pages: int) -> tuple:
+    lines = [f"Invoice #{rng.randint(1000, 9999)}", "Terms and conditions apply.", ""]
+    lines += [f"Item {n}: consulting services, {rng.randint(1, 40)} hours" for n in range(pages * LINES_PER_PAGE)]
+    return lines, []
+
+
+def write_pdf(path: str, lines: list, links: list):
+    doc = fitz.open()
+    for start in range(0, len(lines), LINES_PER_PAGE):
+        page = doc.new_page()
+        page.insert_text((50, 50), "\n".join(lines[start:start + LINES_PER_PAGE]), fontsize=9)
+    first_page = doc[0]
+    for n, uri in enumerate(links):
+        rect = fitz.Rect(50, 700 + n * 8, 250, 707 + n * 8)
+        first_page.insert_link({"kind": fitz.LINK_URI, "from": rect, "uri": uri})
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(path: str, lines: list, links: list):
+    doc = Document()
+    for line in lines + links:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_txt(path: str, lines: list, links: list):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines + links) + "\n")
+
+
+WRITERS = {"pdf": write_pdf, "docx": write_docx, "txt": write_txt}
+
+
+def generate_corpus(out_dir: str, count: int, seed: int = 0) -> list:
+    """Writes `count` documents into out_dir and returns their paths."""
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for index in range(count):
+        pages = _weighted(rng, LENGTH_PROFILE)
+        fmt = _weighted(rng, FORMATS)
+        if rng.random() < NON_RESUME_SHARE:
+            lines, links = non_resume_lines(rng, pages)
+        else:
+            lines, links = resume_lines(rng, index, pages)
+        path = os.path.join(out_dir, f"doc_{index:05d}_{pages}p.{fmt}")
+        WRITERS[fmt](path, lines, links)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume corpus.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    paths = generate_corpus(args.out_dir, args.count, args.seed)
+    print(f"Wrote {len(paths)} documents to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import json
+import sqlite3
+import datetime
+import contextlib
+import threading
+from types import SimpleNamespace
+import services.database as database
+import services.near_duplicates as near_duplicates
+import graph.nodes as nodes
+
+
+class SQLiteProfileStore:
+    """
+    A local stand-in for the prism_table functions used by the graph and bulk ingestion.
+    It keeps the same call signatures and return values as services/database.py,
+    with an in-memory SQLite table instead of PostgreSQL.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("""
+            CREATE TABLE prism_table (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT UNIQUE,
+                name TEXT, summary TEXT, top_area_of_expertise TEXT, latest_projects_and_publications TEXT,
+                phone_number TEXT, linkedin_url TEXT, education TEXT, work_experience TEXT,
+                github_url TEXT, portfolio_url TEXT, minhash_signature TEXT,
+                updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+            )
+        """)
+        self.statements = 0
+        # check_if_profile_exists is a LangChain tool in the real module, called via .invoke().
+        self.check_if_profile_exists = SimpleNamespace(invoke=lambda args: self.find_profile_by_emails([args["email"]]))
+
+    def find_profile_by_emails(self, emails: list) -> dict:
+        candidates = sorted({e for email in emails if email for e in (email, email.lower())})
+        if not candidates: return {"exists": False, "profile": None}
+        with self._lock:
+            self.statements += 1
+            cur = self._conn.execute(
+                f"SELECT * FROM prism_table WHERE email IN ({', '.join('?' * len(candidates))}) LIMIT 1", candidates)
+            row = cur.fetchone()
+            if row:
+                return {"exists": True, "profile": database._profile_from_row(cur, row)}
+        return {"exists": False, "profile": None}
+
+    def get_profile_by_id(self, profile_id: int):
+        with self._lock:
+            self.statements += 1
+            cur = self._conn.execute("SELECT * FROM prism_table WHERE id = ?", (profile_id,))
+            row = cur.fetchone()
+            return database._profile_from_row(cur, row) if row else None
+
+    def load_minhash_signatures(self, after: tuple = None, limit: int = database.MINHASH_LOAD_BATCH_SIZE) -> list:
+        updated_at, after_id = (after[0].isoformat(timespec="milliseconds"), after[1]) if after else ("", 0)
+        with self._lock:
+            self.statements += 1
+            rows = self._conn.execute(
+                "SELECT id, minhash_signature, updated_at FROM prism_table "
+                "WHERE (updated_at, id) > (?, ?) AND minhash_signature IS NOT NULL "
+                "ORDER BY updated_at, id LIMIT ?", (updated_at, after_id, limit)).fetchall()
+        return [(profile_id, json.loads(signature), datetime.datetime.fromisoformat(updated))
+                for profile_id, signature, updated in rows]
+
+    def _write(self, rows: list, policy: str) -> list:
+        columns = ", ".join(database.PROFILE_COLUMNS)
+        placeholders = ", ".join("?" * len(database.PROFILE_COLUMNS))
+        conflict = "DO NOTHING" if policy == "skip" else "DO UPDATE SET " + ", ".join(
+            f"{c} = excluded.{c}" for c in database.PROFILE_COLUMNS[1:]) + (
+            ", updated_at = strftime('%Y-%m-%dT%H:%M:%f', 'now')")
+        returned = []
+        with self._lock:
+            self.statements += 1
+            self._conn.execute("BEGIN")
+            for row in rows:
+                # SQLite has no array type; the signature is stored as JSON text.
+                row = tuple(json.dumps(value) if isinstance(value, list) else value for value in row)
+                existed = row[0] is not None and self._conn.execute(
+                    "SELECT 1 FROM prism_table WHERE email = ?", (row[0],)).fetchone() is not None
+                if existed and policy == "skip":
+                    continue
+                cur = self._conn.execute(
+                    f"INSERT INTO prism_table ({columns}) VALUES ({placeholders}) ON CONFLICT (email) {conflict}", row)
+                profile_id = (self._conn.execute("SELECT id FROM prism_table WHERE email = ?", (row[0],)).fetchone()[0]
+                              if existed else cur.lastrowid)
+                returned.append((profile_id, row[0], not existed))
+            self._conn.execute("COMMIT")
+        return returned
+
+    def upsert_profile(self, profile_data: dict, policy: str = None, signature: list = None) -> tuple:
+        returned = self._write([database._profile_row(profile_data, signature)],
+                               policy or database.PROFILE_CONFLICT_POLICY)
+        if not returned:
+            return "skipped", None
+        profile_id, _, inserted = returned[0]
+        return ("inserted" if inserted else "updated"), profile_id
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM prism_table").fetchone()[0]
+
+
+def install(store: SQLiteProfileStore) -> SQLiteProfileStore:
+    """Points the graph nodes and ProfileBulkWriter at the SQLite store instead of PostgreSQL."""
+    nodes.find_profile_by_emails = store.find_profile_by_emails
+    nodes.upsert_profile = store.upsert_profile
+    nodes.check_if_profile_exists = store.check_if_profile_exists
+    nodes.get_profile_by_id = store.get_profile_by_id
+    # The near-duplicate index loads signatures through the database module at call time.
+    database.load_minhash_signatures = store.load_minhash_signatures
+    near_duplicates._index = None  # Drop signatures loaded from a previous store
+    # ProfileBulkWriter.flush() borrows a connection and hands it to _write_rows(); both are redirected.
+    database.get_connection = lambda: contextlib.nullcontext(store)
+    database._write_rows = lambda conn, rows, policy: store._write(rows, policy)
+    return store
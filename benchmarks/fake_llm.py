@@ -0,0 +1,108 @@
+import re
+import json
+import time
+import random
+from typing import Any, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from graph.compaction import estimate_tokens
+from graph.contacts import extract_contacts
+from graph.classifier import score_resume
+
+
+class FakeResumeChatModel(BaseChatModel):
+    """
+    An offline stand-in for ChatGroq. It answers the IsResume and ResumeProfile tool
+    calls with valid, deterministic data derived from the prompt, after a simulated
+    network latency, and reports token usage like the real client does.
+    """
+
+    latency_seconds: float = 0.0
+    latency_jitter_seconds: float = 0.0
+    completion_tokens_per_field: int = 12
+    # Characters of tool-call arguments per streamed chunk, and the share of the latency spent before the first one.
+    stream_chunk_chars: int = 40
+    time_to_first_chunk_share: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-resume"
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], tool_choice=tool_choice, **kwargs)
+
+    def _latency(self) -> float:
+        return max(0.0, self.latency_seconds + random.uniform(-1, 1) * self.latency_jitter_seconds)
+
+    def _usage(self, prompt: str, args: dict) -> tuple:
+        return estimate_tokens(prompt), self.completion_tokens_per_field * len(args)
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, tools=None,
+                  **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        tool_name = tools[0]["function"]["name"] if tools else None
+        time.sleep(self._latency())
+
+        args = self._answer(tool_name, prompt)
+        prompt_tokens, completion_tokens = self._usage(prompt, args)
+        message = AIMessage(
+            content="",
+            tool_calls=[{"name": tool_name, "args": args, "id": "call_0", "type": "tool_call"}] if tool_name else [],
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens},
+        )
+        return ChatResult(
+            generations=[ChatGeneration(message=message)],
+            llm_output={"token_usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}},
+        )
+
+    def _stream(self, messages, stop: Optional[List[str]] = None, run_manager=None, tools=None, **kwargs: Any):
+        """Streams the tool-call arguments in small pieces, spreading the simulated latency over them."""
+        prompt = "\n".join(str(m.content) for m in messages)
+        tool_name = tools[0]["function"]["name"] if tools else None
+        arguments = json.dumps(self._answer(tool_name, prompt))
+        pieces = [arguments[i:i + self.stream_chunk_chars] for i in range(0, len(arguments), self.stream_chunk_chars)]
+        latency = self._latency()
+        time.sleep(latency * self.time_to_first_chunk_share)
+        for n, piece in enumerate(pieces):
+            if n:
+                time.sleep(latency * (1 - self.time_to_first_chunk_share) / max(1, len(pieces) - 1))
+            usage = None
+            if n == len(pieces) - 1:
+                # Like the real client, usage is reported once, on the last chunk.
+                prompt_tokens, completion_tokens = self._usage(prompt, json.loads(arguments))
+                usage = {"input_tokens": prompt_tokens, "output_tokens": completion_tokens,
+                         "total_tokens": prompt_tokens + completion_tokens}
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=usage, tool_call_chunks=[
+                {"name": tool_name if n == 0 else None, "args": piece, "id": "call_0" if n == 0 else None, "index": 0}
+            ]))
+
+    @staticmethod
+    def _answer(tool_name: str, prompt: str) -> dict:
+        text = prompt.split("---", 1)[-1]
+        if tool_name == "IsResume":
+            score, signals = score_resume(text)
+            return {"is_resume": score >= 0.3, "reason": f"Simulated verdict ({', '.join(signals) or 'no signals'})."}
+        if tool_name == "ResumeProfile":
+            contacts = extract_contacts(text)
+            lines = [line.strip() for line in text.splitlines() if line.strip() and line.strip() != "---"]
+            companies = re.findall(r"^(.+?) \| (.+?) \| (\d{4}) - (\d{4}|Present)$", text, re.MULTILINE)
+            return {
+                "name": lines[0] if lines else None,
+                "email": contacts["email"],
+                "phone_number": contacts["phone_number"],
+                "linkedin_url": contacts["linkedin_url"],
+                "github_url": contacts["github_url"],
+                "portfolio_url": contacts["portfolio_url"],
+                "summary": " ".join(lines[1:4])[:300] if len(lines) > 1 else None,
+                "top_skills": sorted(set(re.findall(r"\b(Python|SQL|Java|Go|Rust|Kubernetes|PyTorch|Spark)\b", text)))[:5],
+                "education": [],
+                "work_experience": [
+                    {"company": company, "job_title": title, "start_date": start, "end_date": end, "description": None}
+                    for title, company, start, end in companies
+                ],
+                "latest_three_projects_and_publications": [],
+            }
+        return {}
@@ -0,0 +1,289 @@
+"""
+Offline throughput benchmark for parsing, the full graph and bulk ingestion.
+
+Usage:
+    uv run python -m benchmarks.run --count 200 --llm-latency 0.4 --concurrency 8
+    uv run python -m benchmarks.run --corpus ./bench_corpus --compare latest
+
+Groq is replaced by FakeResumeChatModel (benchmarks/fake_llm.py) and PostgreSQL by
+SQLiteProfileStore (benchmarks/fake_db.py), so no network or database is needed.
+Results are saved as JSON under benchmarks/results/ for comparison between runs.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import asyncio
+import argparse
+import datetime
+import resource
+import tempfile
+import threading
+import subprocess
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+RSS_SAMPLE_INTERVAL_SECONDS = 0.1
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def summarize(durations: list) -> dict:
+    return {
+        "count": len(durations),
+        "p50_ms": round(percentile(durations, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(durations, 0.95) * 1000, 3),
+        "mean_ms": round(sum(durations) / len(durations) * 1000, 3) if durations else 0.0,
+    }
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0  # Exited between listing and reading, or no /proc
+
+
+def _descendants(pid: int) -> list:
+    """Live child processes of `pid`, e.g. the parser's process pool, found through /proc."""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found, pending = [], [pid]
+    while pending:
+        kids = children.get(pending.pop(), [])
+        found += kids
+        pending += kids
+    return found
+
+
+class RSSSampler:
+    """
+    Samples the resident memory of this process plus its live children in a background thread
+    and keeps the peak. Unlike tracemalloc this includes C-extension allocations (PyMuPDF,
+    SQLite, numpy) and the parse workers. Without /proc (not Linux) nothing is sampled.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.enabled = os.path.exists(f"/proc/{os.getpid()}/statm")
+        self.start_bytes = self.peak_bytes = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def sample(self) -> int:
+        if not self.enabled:
+            return 0
+        pid = os.getpid()
+        total = sum(_rss_bytes(p) for p in [pid] + _descendants(pid))
+        self.peak_bytes = max(self.peak_bytes, total)
+        return total
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.start_bytes = self.sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+        self.sample()
+
+
+def _max_rss_mb(who) -> float:
+    # ru_maxrss is reported in kilobytes on Linux.
+    return round(resource.getrusage(who).ru_maxrss / 1024, 1)
+
+
+def measure(stage):
+    """
+    Runs a stage while sampling RSS and adds wall time, throughput and memory to its result:
+    the peak RSS of the process and its children, its growth over the stage, and the largest
+    RSS of any child process that has exited.
+    """
+    def run(paths, *args, **kwargs):
+        with RSSSampler() as rss:
+            started = time.perf_counter()
+            result = stage(paths, *args, **kwargs)
+            elapsed = time.perf_counter() - started
+        result.update(seconds=round(elapsed, 3), docs_per_sec=round(len(paths) / elapsed, 3),
+                      peak_rss_mb=round(rss.peak_bytes / 2**20, 1),
+                      rss_growth_mb=round((rss.peak_bytes - rss.start_bytes) / 2**20, 1),
+                      children_max_rss_mb=_max_rss_mb(resource.RUSAGE_CHILDREN))
+        return result
+    return run
+
+
+@measure
+def bench_parse(paths: list) -> dict:
+    from services.file_parser import parse_file
+
+    durations = []
+    for path in paths:
+        with open(path, "rb") as f:
+            durations.append(parse_file(f).parse_seconds)
+    return {"per_document": summarize(durations)}
+
+
+@measure
+def bench_graph(paths: list) -> dict:
+    from services.file_parser import parse_file
+    from graph.graph import get_app
+    from graph.state import GraphState
+    from services.cache import get_extraction_cache
+    from benchmarks.fake_db import SQLiteProfileStore, install
+
+    install(SQLiteProfileStore())
+    get_extraction_cache().clear()
+    per_node, per_document = {}, []
+    for path in paths:
+        with open(path, "rb") as f:
+            text = parse_file(f).text
+        started = time.perf_counter()
+        final_state = get_app().invoke(GraphState(file_content=text, source=path))
+        per_document.append(time.perf_counter() - started)
+        for record in final_state.get('node_metrics') or []:
+            per_node.setdefault(record["node"], []).append(record["seconds"])
+    return {"per_document": summarize(per_document),
+            "per_node": {node: summarize(values) for node, values in per_node.items()}}
+
+
+@measure
+def bench_ingest(paths: list, concurrency: int, write_batch_size: int) -> dict:
+    import ingest
+    from graph.graph import get_app
+    from services.cache import get_extraction_cache
+    from benchmarks.fake_db import SQLiteProfileStore, install
+
+    store = install(SQLiteProfileStore())
+    get_extraction_cache().clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, "report.ndjson")
+        counts = asyncio.run(ingest.run_ingestion(get_app(), paths, report_path,
+                                                  concurrency, write_batch_size=write_batch_size))
+        # Each report record carries the document's time from parse start to its graph result.
+        with open(report_path, encoding="utf-8") as f:
+            durations = [record["seconds"] for record in map(json.loads, f) if "seconds" in record]
+    return {"counts": counts, "per_document": summarize(durations), "db_statements": store.statements,
+            "concurrency": concurrency, "write_batch_size": write_batch_size}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _load_previous(compare: str) -> dict:
+    if compare == "latest":
+        runs = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+        if not runs:
+            return None
+        compare = runs[-1]
+    with open(compare, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_report(results: dict, previous: dict = None):
+    print(f"\nBenchmark {results['started_at']} (commit {results['commit'] or 'unknown'}), "
+          f"{results['config']['documents']} documents")
+    for stage, data in results["stages"].items():
+        line = (f"  {stage:<8} {data['docs_per_sec']:>9.2f} docs/s   "
+                f"peak RSS {data['peak_rss_mb']:>8.1f} MB (+{data['rss_growth_mb']:.1f})")
+        if "per_document" in data:
+            line += f"   p50 {data['per_document']['p50_ms']:>9.2f} ms   p95 {data['per_document']['p95_ms']:>9.2f} ms"
+        if previous and stage in previous.get("stages", {}):
+            before = previous["stages"][stage]["docs_per_sec"]
+            line += f"   ({(data['docs_per_sec'] - before) / before * 100:+.1f}% docs/s vs {previous['commit'] or 'previous'})"
+        print(line)
+        for node, summary in data.get("per_node", {}).items():
+            print(f"      {node:<22} p50 {summary['p50_ms']:>9.2f} ms   p95 {summary['p95_ms']:>9.2f} ms")
+    print(f"  process peak RSS {results['peak_rss_mb']:.1f} MB, largest exited child {results['children_max_rss_mb']:.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline pipeline benchmark.")
+    parser.add_argument("--corpus", help="Existing corpus directory; a synthetic one is generated if omitted.")
+    parser.add_argument("--count", type=int, default=100, help="Documents to generate when --corpus is omitted.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", default="parse,graph,ingest", help="Comma-separated subset of parse,graph,ingest.")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Simulated seconds per LLM call.")
+    parser.add_argument("--llm-jitter", type=float, default=0.1, help="Uniform +/- jitter on the simulated latency.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Documents in flight for the ingest stage.")
+    parser.add_argument("--write-batch-size", type=int, default=50)
+    parser.add_argument("--no-fastpath", action="store_true", help="Send every resume check to the (fake) LLM.")
+    parser.add_argument("--no-near-duplicates", action="store_true", help="Skip the MinHash near-duplicate check.")
+    parser.add_argument("--compare", help="Results file to compare against, or 'latest'.")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results file.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configure the offline environment before any project module reads its settings.
+        os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+        os.environ["EXTRACTION_CACHE_PATH"] = os.path.join(tmp, "cache.sqlite3")
+        os.environ["RESUME_FASTPATH_ENABLED"] = "false" if args.no_fastpath else "true"
+        os.environ["NEAR_DUPLICATE_ENABLED"] = "false" if args.no_near_duplicates else "true"
+
+        from graph import chains
+        from benchmarks.fake_llm import FakeResumeChatModel
+        from graph.instrumentation import TOKEN_USAGE_HANDLER
+        chains.use_chat_model(FakeResumeChatModel(latency_seconds=args.llm_latency,
+                                                  latency_jitter_seconds=args.llm_jitter,
+                                                  callbacks=[TOKEN_USAGE_HANDLER]))
+
+        if args.corpus:
+            from ingest import discover_files
+            paths = discover_files(args.corpus)
+        else:
+            from benchmarks.corpus import generate_corpus
+            paths = generate_corpus(os.path.join(tmp, "corpus"), args.count, args.seed)
+
+        stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+        results = {
+            "started_at": datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+            "commit": _git_commit(),
+            "config": {"documents": len(paths), "llm_latency": args.llm_latency, "llm_jitter": args.llm_jitter,
+                       "fastpath": not args.no_fastpath, "near_duplicates": not args.no_near_duplicates,
+                       "corpus": args.corpus or f"synthetic(seed={args.seed})"},
+            "stages": {},
+        }
+        if "parse" in stages:
+            results["stages"]["parse"] = bench_parse(paths)
+        if "graph" in stages:
+            results["stages"]["graph"] = bench_graph(paths)
+        if "ingest" in stages:
+            results["stages"]["ingest"] = bench_ingest(paths, args.concurrency, args.write_batch_size)
+        results["peak_rss_mb"] = _max_rss_mb(resource.RUSAGE_SELF)
+        results["children_max_rss_mb"] = _max_rss_mb(resource.RUSAGE_CHILDREN)
+
+    previous = _load_previous(args.compare) if args.compare else None
+    print_report(results, previous)
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{results['started_at']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Cold-start import profile of the app, the graph and the command-line entry points.
+
+Usage:
+    uv run python -m benchmarks.startup
+    uv run python -m benchmarks.startup --repeat 5 --top 15 --compare latest
+
+Each target runs in a fresh interpreter with `-X importtime`. The report shows the
+best wall time over --repeat runs (minus bare interpreter start-up) and the
+slowest top-level imports. Results are saved under benchmarks/results/startup/.
+"""
+import os
+import sys
+import json
+import glob
+import time
+import argparse
+import datetime
+import subprocess
+from .run import _git_commit
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "startup")
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What a cold process does before it can serve its first request.
+TARGETS = {
+    "uploader_view": "import ui_components.uploader",
+    "search_view": "import ui_components.search",
+    "graph_import": "import graph.graph",
+    "graph_compiled": "import graph.graph as g; g.get_app()",
+    "worker": "import worker",
+    "ingest": "import ingest",
+}
+
+
+def run_target(code: str) -> tuple:
+    """Runs `code` in a fresh interpreter; returns (wall seconds, importtime stderr)."""
+    env = dict(os.environ, GROQ_API_KEY=os.environ.get("GROQ_API_KEY", "startup-profile"))
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=PROJECT_ROOT,
+                               env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(f"`{code}` failed:\n{completed.stderr[-2000:]}")
+    return elapsed, completed.stderr
+
+
+def top_level_imports(importtime_output: str) -> dict:
+    """Cumulative microseconds per import made directly by the target (not by other imports)."""
+    cumulative = {}
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented by two spaces per level after the separator.
+        if name.startswith("  "):
+            continue
+        name = name.strip()
+        cumulative[name] = cumulative.get(name, 0) + int(total)
+    return cumulative
+
+
+def profile(repeat: int) -> dict:
+    baseline, baseline_output = min((run_target("pass") for _ in range(repeat)), key=lambda run: run[0])
+    # Modules every interpreter imports at start-up (site, encodings, ...) are not attributed to targets.
+    interpreter_imports = set(top_level_imports(baseline_output))
+    targets = {}
+    for target, code in TARGETS.items():
+        runs = [run_target(code) for _ in range(repeat)]
+        best_seconds, best_output = min(runs, key=lambda run: run[0])
+        imports = {name: us for name, us in top_level_imports(best_output).items() if name not in interpreter_imports}
+        targets[target] = {
+            "code": code,
+            "seconds": round(max(0.0, best_seconds - baseline), 4),
+            "import_seconds": round(sum(imports.values()) / 1e6, 4),
+            "top_imports": {name: round(us / 1e6, 4)
+                            for name, us in sorted(imports.items(), key=lambda item: -item[1])},
+        }
+    return {"interpreter_seconds": round(baseline, 4), "targets": targets}
+
+
+def _load_previous(compare: str) -> dict:
+    if compare == "latest":
+        runs = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+        if not runs:
+            return None
+        compare = runs[-1]
+    with open(compare, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def print_report(results: dict, top: int, previous: dict = None):
+    print(f"\nStartup profile {results['started_at']} (commit {results['commit'] or 'unknown'}), "
+          f"interpreter start-up {results['interpreter_seconds'] * 1000:.0f} ms excluded")
+    for target, data in results["targets"].items():
+        line = f"  {target:<16} {data['seconds'] * 1000:>8.0f} ms   imports {data['import_seconds'] * 1000:>8.0f} ms"
+        if previous and target in previous.get("targets", {}):
+            before = previous["targets"][target]["seconds"]
+            line += f"   ({(data['seconds'] - before) * 1000:+.0f} ms vs {previous['commit'] or 'previous'})"
+        print(line)
+        for name, seconds in list(data["top_imports"].items())[:top]:
+            print(f"      {name:<40} {seconds * 1000:>8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile cold-start import time.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per target; the fastest is reported.")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports shown per target.")
+    parser.add_argument("--compare", help="Results file to compare against, or 'latest'.")
+    parser.add_argument("--no-save", action="store_true", help="Do not write the results file.")
+    args = parser.parse_args(argv)
+
+    results = {
+        "started_at": datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ"),
+        "commit": _git_commit(),
+        "python": sys.version.split()[0],
+    }
+    results.update(profile(max(1, args.repeat)))
+
+    previous = _load_previous(args.compare) if args.compare else None
+    print_report(results, args.top, previous)
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{results['started_at']}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
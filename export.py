@@ -0,0 +1,138 @@
+"""
+Bulk export of stored profiles as NDJSON or Parquet.
+
+Usage:
+    uv run python export.py profiles.ndjson.gz
+    uv run python export.py profiles.parquet --format parquet          # needs pyarrow
+    uv run python export.py changes.ndjson --state export_state.json   # only profiles written since the last run
+    uv run python export.py - --updated-since 2025-01-01T00:00:00Z | jq .email
+
+Rows are streamed from a server-side cursor and written batch by batch, so memory use
+stays flat however large prism_table is. Files are written under a temporary name and
+renamed when complete. With --state, each export saves a watermark a few minutes before
+its snapshot, which the next run uses as --updated-since. Incremental exports therefore
+overlap: a profile can appear in more than one, and consumers keep the latest row per id.
+"""
+import os
+import sys
+import json
+import gzip
+import time
+import datetime
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+
+from services.database import export_profiles, EXPORT_BATCH_SIZE, EXPORT_COLUMNS, JSONB_COLUMNS
+
+FORMATS = ("ndjson", "parquet")
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_ndjson(batches, out):
+    """Writes one JSON object per profile line to a text stream."""
+    for batch in batches:
+        out.writelines(json.dumps(row, ensure_ascii=False, default=_json_default) + "\n" for row in batch)
+
+
+def _parquet_schema(pa):
+    types = {"id": pa.int64()}
+    types.update((column, pa.timestamp("us", tz="UTC")) for column in TIMESTAMP_COLUMNS)
+    # JSONB columns hold free-form nested lists, so they are stored as JSON text.
+    return pa.schema([(column, types.get(column, pa.string())) for column in EXPORT_COLUMNS])
+
+
+def write_parquet(batches, path: str):
+    """Writes each batch as one Parquet row group."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet export needs pyarrow: uv pip install pyarrow") from None
+    schema = _parquet_schema(pa)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for batch in batches:
+            for row in batch:
+                for column in JSONB_COLUMNS:
+                    row[column] = json.dumps(row[column], ensure_ascii=False) if row[column] is not None else None
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+
+
+def _parse_timestamp(value: str) -> datetime.datetime:
+    parsed = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    # Naive timestamps are taken as UTC rather than the database session's time zone.
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=datetime.timezone.utc)
+
+
+def _load_state(path: str):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return _parse_timestamp(json.load(f)["watermark"])
+
+
+def _save_state(path: str, export):
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"snapshot_at": export.snapshot_at.isoformat(), "watermark": export.watermark.isoformat(),
+                   "rows": export.rows}, f)
+    os.replace(path + ".tmp", path)
+
+
+def run_export(output: str, fmt: str, updated_since=None, batch_size: int = EXPORT_BATCH_SIZE):
+    """Exports to `output` ("-" for stdout, NDJSON only) and returns the finished ProfileExport."""
+    export = export_profiles(updated_since=updated_since, batch_size=batch_size)
+    if output == "-":
+        write_ndjson(export, sys.stdout)
+        return export
+
+    partial = output + ".partial"
+    try:
+        if fmt == "parquet":
+            write_parquet(export, partial)
+        else:
+            opener = gzip.open if output.endswith(".gz") else open
+            with opener(partial, "wt", encoding="utf-8") as out:
+                write_ndjson(export, out)
+        os.replace(partial, output)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return export
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export stored profiles as NDJSON or Parquet.")
+    parser.add_argument("output", help="Output file (.gz compresses NDJSON), or - for NDJSON on stdout.")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="Output format (default: parquet for .parquet files, otherwise ndjson).")
+    parser.add_argument("--updated-since", type=_parse_timestamp, default=None,
+                        help="Only export profiles written at or after this ISO-8601 time.")
+    parser.add_argument("--state", help="JSON file recording the last export; later runs only export what changed.")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE,
+                        help="Rows fetched from the database per round trip.")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "ndjson")
+    if fmt == "parquet" and args.output == "-":
+        parser.error("Parquet cannot be written to stdout; give a file name.")
+    updated_since = args.updated_since or _load_state(args.state)
+
+    started = time.perf_counter()
+    export = run_export(args.output, fmt, updated_since, args.batch_size)
+    elapsed = time.perf_counter() - started
+    since = f" written since {updated_since.isoformat()}" if updated_since else ""
+    print(f"Exported {export.rows} profiles{since} in {elapsed:.1f}s "
+          f"({export.rows / elapsed if elapsed else 0:.0f} rows/s)", file=sys.stderr)
+    if args.state:
+        _save_state(args.state, export)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,69 @@
 
-from langchain_groq import ChatGroq
+import threading
 from .schemas import IsResume, ResumeProfile
+from .instrumentation import TOKEN_USAGE_HANDLER
+from .gateway import (LLMGateway, RoutedChain, LLM_CLASSIFICATION_MODELS, LLM_EXTRACTION_MODELS,
+                      LLM_TIMEOUT_SECONDS)
 
-# Using Llama3 8B for speed, can be switched to 70B for higher accuracy
-llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0)
+# The chat models and the chains below are built on first access (see __getattr__), so importing
+# this module neither imports langchain_groq nor needs a GROQ_API_KEY.
+_build_lock = threading.Lock()
+_LAZY_ATTRIBUTES = ("gateway", "structured_resume_check_llm", "structured_profile_extraction_llm",
+                    "streaming_profile_extraction_llm")
 
-# Create structured LLMs for specific tasks
-structured_resume_check_llm = llm.with_structured_output(IsResume)
-structured_profile_extraction_llm = llm.with_structured_output(ResumeProfile)
\ No newline at end of file
+# Expected completion sizes, reserved against the tokens-per-minute quota with the prompt.
+RESUME_CHECK_OUTPUT_TOKENS = 100
+PROFILE_EXTRACTION_OUTPUT_TOKENS = 1500
+
+def _groq_chat_model(model: str):
+    from langchain_groq import ChatGroq
+    # The gateway retries and throttles, so the client makes a single attempt per call.
+    # The callback attributes token usage to the graph node making each call.
+    return ChatGroq(model=model, temperature=0, timeout=LLM_TIMEOUT_SECONDS, max_retries=0,
+                    callbacks=[TOKEN_USAGE_HANDLER])
+
+def _build_chains(llm_gateway: LLMGateway, classification_models: list, extraction_models: list):
+    """Builds the routed chains from ordered lists of (model name, chat model) per task."""
+    global gateway, structured_resume_check_llm, structured_profile_extraction_llm, streaming_profile_extraction_llm
+    gateway = llm_gateway
+    # Create structured LLMs for specific tasks
+    structured_resume_check_llm = RoutedChain(
+        gateway, "resume_check", [(name, llm.with_structured_output(IsResume)) for name, llm in classification_models],
+        RESUME_CHECK_OUTPUT_TOKENS)
+    structured_profile_extraction_llm = RoutedChain(
+        gateway, "profile_extraction",
+        [(name, llm.with_structured_output(ResumeProfile)) for name, llm in extraction_models],
+        PROFILE_EXTRACTION_OUTPUT_TOKENS)
+    # The same forced tool call without the output parser, so its arguments can be streamed.
+    streaming_profile_extraction_llm = RoutedChain(
+        gateway, "profile_extraction",
+        [(name, llm.bind_tools([ResumeProfile], tool_choice="ResumeProfile")) for name, llm in extraction_models],
+        PROFILE_EXTRACTION_OUTPUT_TOKENS)
+
+def use_chat_model(chat_model):
+    """
+    Rebuilds the structured chains on top of another chat model, e.g. the offline
+    stand-in used by the benchmarks. Every task uses that model and nothing is throttled.
+    Nodes look the chains up on this module at call time.
+    """
+    name = getattr(chat_model, "model_name", None) or type(chat_model).__name__
+    _build_chains(LLMGateway(rate_limits={}), [(name, chat_model)], [(name, chat_model)])
+
+def _build_default_chains():
+    chat_models = {}
+    def chat_model(name):
+        if name not in chat_models:
+            chat_models[name] = _groq_chat_model(name)
+        return chat_models[name]
+    _build_chains(LLMGateway(),
+                  [(name, chat_model(name)) for name in LLM_CLASSIFICATION_MODELS],
+                  [(name, chat_model(name)) for name in LLM_EXTRACTION_MODELS])
+
+def __getattr__(name):
+    # Only called while the attribute is missing, i.e. before the chains have been built.
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _build_lock:
+        if name not in globals():
+            _build_default_chains()
+    return globals()[name]
@@ -0,0 +1,104 @@
+import os
+import re
+import threading
+from .schemas import IsResume
+
+# --- Configuration ---
+# Scores at or above ACCEPT are resumes and at or below REJECT are not, without asking the LLM.
+# Anything in between falls back to the LLM check.
+FASTPATH_ENABLED = os.getenv('RESUME_FASTPATH_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+FASTPATH_ACCEPT = float(os.getenv('RESUME_FASTPATH_ACCEPT', '0.7'))
+FASTPATH_REJECT = float(os.getenv('RESUME_FASTPATH_REJECT', '0.1'))
+
+# Only the start of the document is scored, matching what the LLM check sees.
+SCORED_PREFIX_CHARS = 5000
+
+SECTION_HEADER = re.compile(
+    r"^\s*(?P<name>(?:work |professional |research |teaching )?experience|employment(?: history)?|"
+    r"education|academic background|(?:technical |core )?skills|projects|publications|certifications|"
+    r"awards|(?:professional )?summary|objective|research interests|references)\s*:?\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE = re.compile(r"(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{3,4}")
+MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+DATE = rf"(?:{MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+DATE_RANGE = re.compile(rf"{DATE}\s*(?:-|–|—|to)\s*(?:{DATE}|present|current|now)", re.IGNORECASE)
+DEGREE = re.compile(r"\b(?:bachelor|master|ph\.?\s?d|doctorate|b\.?\s?(?:sc|tech|e|a)|m\.?\s?(?:sc|tech|s|a|ba))\b",
+                    re.IGNORECASE)
+PROFILE_LINK = re.compile(r"(?:linkedin\.com/in/|github\.com/)", re.IGNORECASE)
+NEGATIVE = re.compile(
+    r"\b(?:invoice|receipt|purchase order|terms and conditions|table of contents|dear (?:sir|madam|hiring)|"
+    r"abstract|chapter \d+|minutes of (?:the )?meeting|job description|we are looking for)\b",
+    re.IGNORECASE,
+)
+
+_lock = threading.Lock()
+_stats = {"fast_accept": 0, "fast_reject": 0, "llm_fallback": 0}
+
+
+def score_resume(text: str) -> tuple:
+    """
+    Scores how much a document looks like a resume, from 0.0 to 1.0.
+    Returns the score and the list of signals that contributed to it.
+    """
+    text = text[:SCORED_PREFIX_CHARS]
+    score, signals = 0.0, []
+
+    sections = {m.group('name').lower() for m in SECTION_HEADER.finditer(text)}
+    if sections:
+        score += 0.1 * min(len(sections), 4)
+        signals.append(f"sections ({', '.join(sorted(sections))})")
+    if EMAIL.search(text):
+        score += 0.15
+        signals.append("email")
+    if PHONE.search(text):
+        score += 0.1
+        signals.append("phone number")
+    date_ranges = len(DATE_RANGE.findall(text))
+    if date_ranges:
+        score += 0.05 * min(date_ranges, 3)
+        signals.append(f"{date_ranges} date range(s)")
+    if DEGREE.search(text):
+        score += 0.1
+        signals.append("degree")
+    if PROFILE_LINK.search(text):
+        score += 0.1
+        signals.append("LinkedIn/GitHub link")
+
+    negatives = {m.group(0).lower() for m in NEGATIVE.finditer(text)}
+    if negatives:
+        score -= 0.25 * len(negatives)
+        signals.append(f"non-resume terms ({', '.join(sorted(negatives))})")
+
+    return max(0.0, min(score, 1.0)), signals
+
+
+def classify_resume(text: str):
+    """
+    Returns a confident IsResume verdict from the local score, or None when the
+    score is in the uncertain band and the LLM should decide.
+    """
+    if not FASTPATH_ENABLED:
+        return None
+    score, signals = score_resume(text)
+    reason = f"Local classifier score {score:.2f}: {', '.join(signals) or 'no resume signals'}."
+
+    if score >= FASTPATH_ACCEPT:
+        outcome, verdict = "fast_accept", IsResume(is_resume=True, reason=reason)
+    elif score <= FASTPATH_REJECT:
+        outcome, verdict = "fast_reject", IsResume(is_resume=False, reason=reason)
+    else:
+        outcome, verdict = "llm_fallback", None
+    with _lock:
+        _stats[outcome] += 1
+    return verdict
+
+
+def classifier_stats() -> dict:
+    """How often the local classifier decided on its own versus deferring to the LLM."""
+    with _lock:
+        stats = dict(_stats)
+    total = sum(stats.values())
+    stats["fast_path_rate"] = round((stats["fast_accept"] + stats["fast_reject"]) / total, 4) if total else 0.0
+    return stats
@@ -0,0 +1,173 @@
+import os
+import re
+import json
+from collections import Counter
+from services.file_parser import HYPERLINK_MARKER, PAGE_BREAK
+from .classifier import SECTION_HEADER
+
+# --- Configuration ---
+# Documents whose compacted text exceeds this many (estimated) tokens are extracted section by section.
+PROFILE_INPUT_TOKEN_BUDGET = int(os.getenv('PROFILE_INPUT_TOKEN_BUDGET', '6000'))
+# Bumped whenever compact_text changes what it keeps, so cached extractions are redone.
+COMPACTION_VERSION = 2
+# Headers and footers are looked for among this many non-blank lines at the top and bottom of each page.
+PAGE_EDGE_LINES = 2
+# A short edge line found on at least this many pages is treated as a page header or footer.
+REPEATED_LINE_MIN_PAGES = 2
+REPEATED_LINE_MAX_CHARS = 80
+
+# Sub-word pieces of up to 4 characters plus punctuation: a cheap, tokenizer-free
+# approximation that tracks Llama-style BPE counts closely enough for budgeting.
+TOKEN_PIECE = re.compile(r"\w{1,4}|[^\w\s]")
+# Explicit page numbers ("Page 2", "Page 2 of 5", "2 of 5", "- 2 -") are dropped wherever they are.
+PAGE_NUMBER = re.compile(r"^(?:page\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?|\d{1,4}\s+of\s+\d{1,4}|-\s*\d{1,4}\s*-)$",
+                         re.IGNORECASE)
+# A bare number is only a page number at a page edge, and only if it is not larger than the page
+# count: a year on a line of its own ("2014") is content.
+BARE_NUMBER = re.compile(r"^\d{1,4}$")
+# Headers often carry the page number ("Jane Doe - Page 2"); it is ignored when comparing pages.
+_HEADER_PAGE_NUMBER = re.compile(r"\bpage\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?", re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the number of LLM tokens in a text without loading a tokenizer."""
+    return len(TOKEN_PIECE.findall(text))
+
+
+def _page_edges(lines: list) -> dict:
+    """Maps the first and last PAGE_EDGE_LINES non-blank lines of a page to "top" or "bottom"."""
+    filled = [index for index, line in enumerate(lines) if line]
+    edges = {index: "bottom" for index in filled[-PAGE_EDGE_LINES:]}
+    edges.update((index, "top") for index in filled[:PAGE_EDGE_LINES])
+    return edges
+
+
+def _header_key(line: str, side: str) -> tuple:
+    # A header repeats at the top of pages and a footer at the bottom; a job title that ends one
+    # page and starts the next is neither.
+    return side, _HEADER_PAGE_NUMBER.sub("page #", line)
+
+
+def compact_text(text: str) -> str:
+    """
+    Normalizes whitespace and drops page numbers and page headers/footers, leaving the
+    detected-hyperlinks appendix untouched. Only lines at page boundaries that repeat
+    across pages are treated as headers/footers, so repeated content such as job
+    titles and locations is kept.
+    """
+    body, marker, appendix = text.partition(HYPERLINK_MARKER)
+    pages = [[" ".join(line.split()) for line in page.splitlines()] for page in body.split(PAGE_BREAK)]
+    edges = [_page_edges(lines) for lines in pages]
+
+    pages_with_line = Counter()
+    for lines, edge in zip(pages, edges):
+        pages_with_line.update({_header_key(lines[index], side) for index, side in edge.items()
+                                if len(lines[index]) <= REPEATED_LINE_MAX_CHARS})
+    repeated = {key for key, count in pages_with_line.items() if count >= REPEATED_LINE_MIN_PAGES}
+
+    kept, seen_repeated, blank = [], set(), False
+    for lines, edge in zip(pages, edges):
+        for index, line in enumerate(lines):
+            if not line:
+                # Collapse runs of blank lines into one.
+                if kept and not blank:
+                    kept.append("")
+                blank = True
+                continue
+            if PAGE_NUMBER.match(line):
+                continue
+            if index in edge:
+                if BARE_NUMBER.match(line) and int(line) <= len(pages):
+                    continue
+                key = _header_key(line, edge[index])
+                if key in repeated:
+                    # The first occurrence stays: it may be the top of the document itself.
+                    if key in seen_repeated:
+                        continue
+                    seen_repeated.add(key)
+            kept.append(line)
+            blank = False
+
+    compacted = "\n".join(kept).strip()
+    if marker:
+        compacted += f"\n\n{marker}{appendix.rstrip()}\n"
+    return compacted
+
+
+def _split_long_section(section: str, budget: int) -> list:
+    """Splits one oversized section at line boundaries into pieces that fit the budget."""
+    pieces, current, current_tokens = [], [], 0
+    for line in section.splitlines():
+        line_tokens = estimate_tokens(line)
+        if current and current_tokens + line_tokens > budget:
+            pieces.append("\n".join(current))
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += line_tokens
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_into_chunks(text: str, budget: int = PROFILE_INPUT_TOKEN_BUDGET) -> list:
+    """
+    Splits a compacted resume at its section headers and packs consecutive sections into
+    chunks of at most `budget` tokens. The first chunk always holds the opening of the
+    document (name, contact details, summary) and the detected-hyperlinks appendix.
+    """
+    body, marker, appendix = text.partition(HYPERLINK_MARKER)
+    starts = [m.start() for m in SECTION_HEADER.finditer(body)]
+    bounds = [0] + [s for s in starts if s > 0] + [len(body)]
+    sections = [body[a:b].strip() for a, b in zip(bounds, bounds[1:]) if body[a:b].strip()]
+
+    pieces = []
+    for section in sections:
+        if estimate_tokens(section) > budget:
+            pieces.extend(_split_long_section(section, budget))
+        else:
+            pieces.append(section)
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = estimate_tokens(piece)
+        if current and current_tokens + piece_tokens > budget:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+
+    if marker and chunks:
+        chunks[0] += f"\n\n{marker}{appendix.rstrip()}\n"
+    return chunks or [text]
+
+
+def _dedupe(items: list) -> list:
+    seen, unique = set(), []
+    for item in items:
+        key = json.dumps(item, sort_keys=True).lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(item)
+    return unique
+
+
+def merge_profiles(partials: list) -> dict:
+    """
+    Reduces per-chunk extraction results into one profile dict.
+    Scalar fields come from the first chunk that has them (the opening of the document);
+    list fields are concatenated in document order with duplicates removed.
+    """
+    merged = {}
+    for partial in partials:
+        for field, value in partial.items():
+            if isinstance(value, list):
+                merged[field] = _dedupe((merged.get(field) or []) + value)
+            elif merged.get(field) is None:
+                merged[field] = value
+    if merged.get('top_skills'):
+        merged['top_skills'] = merged['top_skills'][:5]
+    if merged.get('latest_three_projects_and_publications'):
+        merged['latest_three_projects_and_publications'] = merged['latest_three_projects_and_publications'][:3]
+    return merged
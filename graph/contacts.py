@@ -0,0 +1,117 @@
+import re
+from urllib.parse import urlparse
+from services.file_parser import HYPERLINK_MARKER
+from .classifier import EMAIL, SECTION_HEADER
+
+# Spaces and tabs only: a match must not run across lines, e.g. from one date line into the next.
+PHONE = re.compile(r"(?<![\w/.-])\+?\(?\d[\d \t().-]{7,18}\d(?![\w/-])")
+URL = re.compile(r"(?:https?://|www\.)[^\s<>()\"']+|(?:linkedin\.com/in|github\.com)/[^\s<>()\"']+",
+                 re.IGNORECASE)
+DATE_LIKE = re.compile(r"^\d{4}\s*[-–]\s*\d{4}$|^\d{1,2}[./-]\d{1,2}[./-]\d{2,4}$")
+YEAR_RANGE = re.compile(r"(?<!\d)(?:19|20)\d{2}\s*[-–]\s*(?:19|20)\d{2}(?!\d)")
+YEARS_ONLY = re.compile(r"^(?:(?:19|20)\d{2}[\s().–-]*)+$")
+
+# Contact details are only taken from the top of the document, before the first section
+# heading: emails and phone numbers further down belong to referees, advisors or employers.
+HEADER_MAX_CHARS = 2000
+
+# Links to these sites are never a candidate's personal portfolio.
+NON_PORTFOLIO_DOMAINS = (
+    "linkedin.com", "github.com", "twitter.com", "x.com", "facebook.com", "instagram.com", "youtube.com",
+    "google.com", "scholar.google.com", "doi.org", "arxiv.org", "researchgate.net", "orcid.org",
+    "medium.com", "stackoverflow.com", "gitlab.com", "bitbucket.org", "kaggle.com", "leetcode.com",
+)
+
+
+def _split_hyperlink_block(text: str) -> tuple:
+    """Separates the body text from the URLs listed in the detected-hyperlinks appendix."""
+    body, _, appendix = text.partition(HYPERLINK_MARKER)
+    links = [line[2:].strip() for line in appendix.splitlines() if line.startswith("- ")]
+    return body, links
+
+
+def _normalize_url(url: str) -> str:
+    url = url.rstrip(".,;:)]}>")
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    return url
+
+
+def _domain(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _is_phone(candidate: str) -> bool:
+    candidate = candidate.strip()
+    digits = re.sub(r"\D", "", candidate)
+    if not 10 <= len(digits) <= 15:
+        return False
+    return not (DATE_LIKE.match(candidate) or YEAR_RANGE.search(candidate) or YEARS_ONLY.match(candidate))
+
+
+def _document_header(body: str) -> str:
+    """The text before the first section heading, where a resume puts the candidate's own details."""
+    heading = SECTION_HEADER.search(body)
+    end = heading.start() if heading else len(body)
+    return body[:min(end, HEADER_MAX_CHARS)]
+
+
+def _dedupe(values: list) -> list:
+    seen, unique = set(), []
+    for value in values:
+        if value.lower() not in seen:
+            seen.add(value.lower())
+            unique.append(value)
+    return unique
+
+
+def extract_contacts(text: str) -> dict:
+    """
+    Pulls the candidate's email, phone number and profile URLs out of the parsed text with plain rules.
+    Only the document header and the detected-hyperlinks appendix are searched. Without a
+    header email, a mailto: link is used only if it is the only one, since the appendix is
+    not in document order.
+    """
+    body, links = _split_hyperlink_block(text)
+    header = _document_header(body)
+
+    mailto, tel, urls = [], [], []
+    for link in links:
+        if link.lower().startswith("mailto:"):
+            mailto.append(link[7:].split("?")[0])
+        elif link.lower().startswith("tel:"):
+            tel.append(link[4:])
+        else:
+            urls.append(_normalize_url(link))
+    mailto, tel = _dedupe(mailto), _dedupe(tel)
+    emails = EMAIL.findall(header) or (mailto if len(mailto) == 1 else [])
+    phones = [p.strip() for p in PHONE.findall(header) if _is_phone(p)] or (tel if len(tel) == 1 else [])
+    urls = [_normalize_url(u) for u in URL.findall(header)] + urls
+
+    linkedin = [u for u in urls if "linkedin.com/in/" in u.lower()]
+    # A profile link has a single path segment; deeper links point at repositories.
+    github = [u for u in urls if _domain(u) == "github.com" and len(urlparse(u).path.strip("/").split("/")) == 1]
+    portfolio = [u for u in urls if _domain(u) and not _domain(u).endswith(NON_PORTFOLIO_DOMAINS)]
+
+    return {
+        "email": emails[0] if emails else None,
+        "phone_number": phones[0] if phones else None,
+        "linkedin_url": linkedin[0] if linkedin else None,
+        "github_url": github[0] if github else None,
+        "portfolio_url": portfolio[0] if portfolio else None,
+    }
+
+
+def apply_contact_ground_truth(profile_data: dict, contacts: dict) -> dict:
+    """
+    Overrides LLM-extracted contact fields with the rule-derived values.
+    The email, phone number, LinkedIn and GitHub URLs are matched exactly by the rules, so they win.
+    The portfolio rule is a guess, so it only fills the field when the LLM left it empty.
+    """
+    for field in ("email", "phone_number", "linkedin_url", "github_url"):
+        if contacts.get(field):
+            profile_data[field] = contacts[field]
+    if contacts.get("portfolio_url") and not profile_data.get("portfolio_url"):
+        profile_data["portfolio_url"] = contacts["portfolio_url"]
+    return profile_data
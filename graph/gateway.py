@@ -0,0 +1,262 @@
+"""
+Rate-limited, retrying access to the Groq models, with per-task model routing.
+
+Before each call the gateway reserves one request and the call's estimated tokens
+from the model's token buckets, which are sized to the provider's requests- and
+tokens-per-minute quotas, and waits until both have capacity. Concurrent workers
+therefore queue here instead of being rejected by the provider. Rate-limit, timeout,
+connection and server errors are retried with jittered exponential backoff.
+
+Each task has an ordered list of models (LLM_CLASSIFICATION_MODELS,
+LLM_EXTRACTION_MODELS). The first model answers unless its output fails validation,
+in which case the call is escalated to the next model in the list.
+"""
+import os
+import time
+import random
+import itertools
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from pydantic import ValidationError
+from langchain_core.exceptions import OutputParserException
+from .compaction import estimate_tokens
+from .instrumentation import REGISTRY, TOKEN_USAGE_HANDLER
+
+
+def _model_list(value: str) -> list:
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+def _parse_rate_limits(value: str) -> dict:
+    """Parses "model=rpm/tpm,..." into {model: (requests per minute, tokens per minute)}."""
+    limits = {}
+    for entry in _model_list(value):
+        model, _, quota = entry.partition("=")
+        requests, _, tokens = quota.partition("/")
+        limits[model.strip()] = (float(requests), float(tokens))
+    return limits
+
+
+# --- Configuration ---
+# Ordered from first choice to last resort; a call moves on when the output fails validation.
+LLM_CLASSIFICATION_MODELS = _model_list(os.getenv('LLM_CLASSIFICATION_MODELS',
+                                                  'llama-3.1-8b-instant,llama-3.3-70b-versatile'))
+LLM_EXTRACTION_MODELS = _model_list(os.getenv('LLM_EXTRACTION_MODELS', 'llama-3.3-70b-versatile'))
+# Per-model quotas as "model=requests/tokens" per minute (defaults: Groq free tier). Unlisted models are not throttled.
+GROQ_RATE_LIMITS = _parse_rate_limits(os.getenv('GROQ_RATE_LIMITS',
+                                                'llama-3.1-8b-instant=30/6000,llama-3.3-70b-versatile=30/12000'))
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '4'))
+LLM_RETRY_BASE_SECONDS = float(os.getenv('LLM_RETRY_BASE_SECONDS', '1'))
+LLM_RETRY_MAX_SECONDS = float(os.getenv('LLM_RETRY_MAX_SECONDS', '30'))
+
+WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+def _retryable_errors() -> tuple:
+    """Transient failures worth retrying on the same model."""
+    errors = (TimeoutError, ConnectionError)
+    try:
+        import groq
+    except ImportError:
+        return errors
+    # APITimeoutError is a subclass of APIConnectionError.
+    return errors + (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+
+
+def _is_invalid_output(error: Exception) -> bool:
+    """True if the model answered but its structured output did not validate."""
+    if isinstance(error, (OutputParserException, ValidationError)):
+        return True
+    # Groq rejects a tool call that does not match the schema with a 400 "tool_use_failed".
+    return type(error).__name__ == "BadRequestError" and "tool_use_failed" in str(error)
+
+
+def _retry_after(error: Exception):
+    """Seconds from the Retry-After header of a provider error, if it has one."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _count_request(task: str, model: str, outcome: str):
+    REGISTRY.inc("llm_gateway_requests_total", {"task": task, "model": model, "outcome": outcome},
+                 help="LLM calls made through the gateway, by task, model and outcome.")
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute` units per minute and holds at most one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """
+        Takes `amount` units, going into debt if the bucket is short, and returns the
+        seconds until the debt is repaid. Callers that reserve later wait behind it.
+        """
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= min(amount, self.capacity)  # A call larger than the quota could otherwise never run
+        return max(0.0, -self.level / self.rate)
+
+
+class RateLimiter:
+    """Request and token buckets for one model, plus a pause imposed by the provider's 429 responses."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Reserves capacity for one call; returns how long the caller must wait before making it."""
+        with self._lock:
+            now = time.monotonic()
+            return max(self._requests.reserve(1, now), self._tokens.reserve(tokens, now), self._paused_until - now)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class LLMGateway:
+    """Throttles and retries calls to each model; shared by every chain and worker thread in the process."""
+
+    def __init__(self, rate_limits: dict = None, max_retries: int = LLM_MAX_RETRIES,
+                 retry_base_seconds: float = LLM_RETRY_BASE_SECONDS):
+        rate_limits = GROQ_RATE_LIMITS if rate_limits is None else rate_limits
+        self.limiters = {model: RateLimiter(rpm, tpm) for model, (rpm, tpm) in rate_limits.items()}
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self._retryable = _retryable_errors()
+        self._lock = threading.Lock()
+        self._waiting = {}
+
+    def _throttle(self, model: str, tokens: int):
+        limiter = self.limiters.get(model)
+        if limiter is None:
+            return
+        wait = limiter.reserve(tokens)
+        REGISTRY.observe("llm_gateway_wait_seconds", wait, {"model": model}, buckets=WAIT_BUCKETS,
+                         help="Time calls waited for rate-limit capacity, by model.")
+        if wait <= 0:
+            return
+        REGISTRY.inc("llm_gateway_throttled_total", {"model": model},
+                     help="Calls delayed to stay within the model's rate limits.")
+        self._set_waiting(model, 1)
+        try:
+            time.sleep(wait)
+        finally:
+            self._set_waiting(model, -1)
+
+    def _set_waiting(self, model: str, change: int):
+        with self._lock:
+            self._waiting[model] = self._waiting.get(model, 0) + change
+            REGISTRY.set_gauge("llm_gateway_queue_depth", self._waiting[model], {"model": model},
+                               help="Calls currently waiting for rate-limit capacity, by model.")
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(LLM_RETRY_MAX_SECONDS, self.retry_base_seconds * 2 ** attempt))
+        retry_after = _retry_after(error)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def call(self, task: str, model: str, fn, prompt: str, output_tokens: int):
+        """Calls fn(prompt) on behalf of `model` within its rate limits, retrying transient errors."""
+        tokens = estimate_tokens(prompt) + output_tokens
+        for attempt in itertools.count():
+            self._throttle(model, tokens)
+            try:
+                result = fn(prompt)
+            except self._retryable as error:
+                if attempt >= self.max_retries:
+                    _count_request(task, model, "error")
+                    raise
+                delay = self._backoff(attempt, error)
+                if type(error).__name__ == "RateLimitError" and model in self.limiters:
+                    # Every caller of this model backs off, not only the one that got the 429.
+                    self.limiters[model].pause(delay)
+                REGISTRY.inc("llm_gateway_retries_total", {"model": model, "reason": type(error).__name__},
+                             help="LLM calls retried after a transient error, by model and error.")
+                TOKEN_USAGE_HANDLER.on_retry(None)
+                time.sleep(delay)
+            except Exception as error:
+                _count_request(task, model, "invalid" if _is_invalid_output(error) else "error")
+                raise
+            else:
+                _count_request(task, model, "ok")
+                return result
+
+
+def _started_stream(chain, prompt: str):
+    """Starts a stream and waits for its first chunk, so connection errors surface inside the retry loop."""
+    chunks = iter(chain.stream(prompt))
+    first = next(chunks, None)
+    return itertools.chain([first], chunks) if first is not None else iter(())
+
+
+class RoutedChain:
+    """
+    One task's chains, one per model in routing order, with the invoke/batch/stream
+    interface of the single chain it replaces.
+    """
+
+    def __init__(self, gateway: LLMGateway, task: str, chains: list, output_tokens: int):
+        self.gateway = gateway
+        self.task = task
+        self.chains = chains  # [(model name, runnable)]
+        self.output_tokens = output_tokens
+
+    def invoke(self, prompt: str, start: int = 0):
+        """Calls the models in routing order from position `start`, moving on after invalid output."""
+        for position, (model, chain) in enumerate(self.chains[start:], start=start):
+            last = position == len(self.chains) - 1
+            try:
+                result = self.gateway.call(self.task, model, chain.invoke, prompt, self.output_tokens)
+            except Exception as error:
+                if last or not _is_invalid_output(error):
+                    raise
+            else:
+                if result is not None:
+                    return result
+                if last:
+                    raise ValueError(f"{model} returned no structured output for {self.task}.")
+            REGISTRY.inc("llm_gateway_escalations_total", {"task": self.task, "model": model},
+                         help="Calls passed to the next model after invalid output, by task and model.")
+
+    def batch(self, prompts: list) -> list:
+        """Invokes the prompts concurrently; the gateway keeps them within the rate limits."""
+        if len(prompts) == 1:
+            return [self.invoke(prompts[0])]
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            # Each call runs in a copy of this context, so node metrics and the graph config follow it.
+            futures = [executor.submit(contextvars.copy_context().run, self.invoke, prompt) for prompt in prompts]
+            return [future.result() for future in futures]
+
+    def stream(self, prompt: str):
+        """
+        Streams from the first model only: chunks already passed on cannot be taken back,
+        so retries happen only before the first chunk. If the streamed output then fails
+        validation, the caller hands the prompt to escalate().
+        """
+        model, chain = self.chains[0]
+        yield from self.gateway.call(self.task, model, lambda p: _started_stream(chain, p), prompt, self.output_tokens)
+
+    def escalate(self, prompt: str):
+        """
+        Re-runs a prompt whose streamed output failed validation, without streaming: on the
+        next model in routing order, or once more on the only model there is.
+        """
+        model = self.chains[0][0]
+        _count_request(self.task, model, "invalid")
+        if len(self.chains) > 1:
+            REGISTRY.inc("llm_gateway_escalations_total", {"task": self.task, "model": model},
+                         help="Calls passed to the next model after invalid output, by task and model.")
+        return self.invoke(prompt, start=1 if len(self.chains) > 1 else 0)
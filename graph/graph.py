@@ -1,37 +1,90 @@
 
+import sys
+import argparse
+import threading
 from typing import Literal
 from langgraph.graph import StateGraph, END
 from .state import GraphState
+from .instrumentation import instrument_node, start_metrics_exporters
 from .nodes import (
-    parse_document, check_if_resume, extract_profile_info,
-    check_database, add_to_database
+    parse_document, check_near_duplicate, check_if_resume, pre_extract_contacts,
+    extract_profile_info, check_database, add_to_database
 )
 
-def decide_what_to_do_after_resume_check(state: GraphState) -> Literal["extract_profile", "end_not_resume"]:
-    return "extract_profile" if state['is_resume'] else "end_not_resume"
-
-def decide_after_db_check(state: GraphState) -> Literal["add_to_db", "end_exists"]:
-    return "end_exists" if state['profile_exists_in_db'] else "add_to_db"
-
-# Define the workflow graph
-workflow = StateGraph(GraphState)
-workflow.add_node("parse_document", parse_document)
-workflow.add_node("check_if_resume", check_if_resume)
-workflow.add_node("extract_profile_info", extract_profile_info)
-workflow.add_node("check_database", check_database)
-workflow.add_node("add_to_database", add_to_database)
-
-# Build the graph
-workflow.set_entry_point("parse_document")
-workflow.add_edge("parse_document", "check_if_resume")
-workflow.add_conditional_edges("check_if_resume", decide_what_to_do_after_resume_check, 
-                               {"extract_profile": "extract_profile_info", "end_not_resume": END})
-workflow.add_edge("extract_profile_info", "check_database")
-workflow.add_conditional_edges("check_database", decide_after_db_check, 
-                               {"add_to_db": "add_to_database", "end_exists": END})
-workflow.add_edge("add_to_database", END)
-
-# Compile the graph
-app = workflow.compile()
-
-app.get_graph().draw_mermaid_png(output_file_path="graph.png")
\ No newline at end of file
+def decide_after_near_duplicate_check(state: GraphState) -> Literal["check_resume", "end_exists"]:
+    return "end_exists" if state['profile_exists_in_db'] else "check_resume"
+
+def decide_what_to_do_after_resume_check(state: GraphState) -> Literal["pre_extract", "end_not_resume"]:
+    return "pre_extract" if state['is_resume'] else "end_not_resume"
+
+def decide_after_db_check(state: GraphState) -> Literal["extract_profile", "end_exists"]:
+    return "end_exists" if state['profile_exists_in_db'] else "extract_profile"
+
+def build_workflow() -> StateGraph:
+    """Defines the workflow graph. Every node is wrapped to record latency, tokens and outcome."""
+    workflow = StateGraph(GraphState)
+    workflow.add_node("parse_document", instrument_node("parse_document", parse_document))
+    workflow.add_node("check_near_duplicate", instrument_node("check_near_duplicate", check_near_duplicate))
+    workflow.add_node("check_if_resume", instrument_node("check_if_resume", check_if_resume))
+    workflow.add_node("pre_extract_contacts", instrument_node("pre_extract_contacts", pre_extract_contacts))
+    workflow.add_node("extract_profile_info", instrument_node("extract_profile_info", extract_profile_info))
+    workflow.add_node("check_database", instrument_node("check_database", check_database))
+    workflow.add_node("add_to_database", instrument_node("add_to_database", add_to_database))
+
+    # Build the graph
+    workflow.set_entry_point("parse_document")
+    # Near-duplicates of stored resumes are caught from the text alone, before any LLM call.
+    workflow.add_edge("parse_document", "check_near_duplicate")
+    workflow.add_conditional_edges("check_near_duplicate", decide_after_near_duplicate_check,
+                                   {"check_resume": "check_if_resume", "end_exists": END})
+    workflow.add_conditional_edges("check_if_resume", decide_what_to_do_after_resume_check, 
+                                   {"pre_extract": "pre_extract_contacts", "end_not_resume": END})
+    # The duplicate check runs on rule-extracted emails, before the expensive profile extraction.
+    workflow.add_edge("pre_extract_contacts", "check_database")
+    workflow.add_conditional_edges("check_database", decide_after_db_check, 
+                                   {"extract_profile": "extract_profile_info", "end_exists": END})
+    workflow.add_edge("extract_profile_info", "add_to_database")
+    workflow.add_edge("add_to_database", END)
+    return workflow
+
+
+_app = None
+_app_lock = threading.Lock()
+
+def get_app():
+    """Returns the compiled graph, compiling it (and starting the metrics exporters) on first use."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_workflow().compile()
+                start_metrics_exporters()
+    return _app
+
+def __getattr__(name):
+    # Keeps `from graph.graph import app` working without compiling the graph at import time.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the LangGraph workflow.")
+    parser.add_argument("--draw", metavar="PNG_PATH",
+                        help="Write a PNG diagram (rendered by the mermaid.ink web service).")
+    parser.add_argument("--mermaid", metavar="PATH", help="Write the Mermaid source of the diagram (offline).")
+    args = parser.parse_args(argv)
+    if not args.draw and not args.mermaid:
+        parser.error("Provide --draw and/or --mermaid.")
+
+    drawable = build_workflow().compile().get_graph()
+    if args.mermaid:
+        with open(args.mermaid, "w", encoding="utf-8") as f:
+            f.write(drawable.draw_mermaid())
+    if args.draw:
+        drawable.draw_mermaid_png(output_file_path=args.draw)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
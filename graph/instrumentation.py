@@ -0,0 +1,338 @@
+"""
+Per-node latency, token and outcome metrics for the LangGraph pipeline.
+
+Every graph node is wrapped with instrument_node(), and the LLM client reports token
+usage through TOKEN_USAGE_HANDLER. Metrics are aggregated in-process and exported in
+the Prometheus text format, either over HTTP (METRICS_PORT) or to a file that is
+rewritten periodically (METRICS_FILE, one file per process). Nothing here depends on Streamlit.
+"""
+import os
+import time
+import atexit
+import bisect
+import logging
+import threading
+import functools
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.config import get_stream_writer
+
+# --- Configuration ---
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+# Loopback by default; set METRICS_HOST=0.0.0.0 to let a scraper on another host reach the endpoint.
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_FILE = os.getenv('METRICS_FILE', '')
+METRICS_FILE_INTERVAL_SECONDS = float(os.getenv('METRICS_FILE_INTERVAL_SECONDS', '15'))
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class Histogram:
+    """A cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters, gauges and histograms keyed by metric name and label values."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._help = {}
+        self._collectors = []
+
+    def inc(self, name: str, labels: dict = None, amount: float = 1, help: str = ""):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._help.setdefault(name, ("counter", help))
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, labels: dict = None, help: str = ""):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._help.setdefault(name, ("gauge", help))
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, labels: dict = None, buckets=DURATION_BUCKETS, help: str = ""):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._help.setdefault(name, ("histogram", help))
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def register_collector(self, collector):
+        """Adds a callable returning {metric_name: value} gauges that is read at export time."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """Counters and histogram summaries as plain data, e.g. for benchmark reports."""
+        with self._lock:
+            counters = {(name, labels): value for (name, labels), value in self._counters.items()}
+            gauges = dict(self._gauges)
+            histograms = {key: {"count": h.count, "sum": h.sum} for key, h in self._histograms.items()}
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def render_prometheus(self, extra_labels: tuple = ()) -> str:
+        """The Prometheus text format; extra_labels are added to every series."""
+        lines = []
+        with self._lock:
+            described = set()
+
+            def describe(name):
+                if name not in described:
+                    kind, help_text = self._help[name]
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    described.add(name)
+
+            for (name, labels), value in sorted(self._counters.items()) + sorted(self._gauges.items()):
+                describe(name)
+                lines.append(f"{name}{_format_labels(extra_labels + labels)} {value}")
+            for (name, labels), histogram in sorted(self._histograms.items(), key=lambda item: item[0]):
+                describe(name)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    bucket_labels = extra_labels + labels + (("le", le),)
+                    lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(extra_labels + labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_format_labels(extra_labels + labels)} {histogram.count}")
+            collectors = list(self._collectors)
+
+        for collector in collectors:
+            for name, value in sorted(collector().items()):
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name}{_format_labels(extra_labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape_label(value)}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = MetricsRegistry()
+
+# The metrics record of the node currently running in this context (thread or task).
+_current_node = ContextVar("current_node_metrics", default=None)
+_record_lock = threading.Lock()
+
+
+class TokenUsageHandler(BaseCallbackHandler):
+    """Attributes LLM token usage, errors and retries to the graph node that made the call."""
+
+    def on_llm_end(self, response, **kwargs):
+        record = _current_node.get()
+        prompt_tokens, completion_tokens = _token_usage(response)
+        with _record_lock:
+            if record is not None:
+                record["llm_calls"] += 1
+                record["prompt_tokens"] += prompt_tokens
+                record["completion_tokens"] += completion_tokens
+        node = record["node"] if record else "unknown"
+        REGISTRY.inc("pipeline_llm_tokens_total", {"node": node, "kind": "prompt"}, prompt_tokens,
+                     help="LLM tokens used, by graph node and prompt/completion.")
+        REGISTRY.inc("pipeline_llm_tokens_total", {"node": node, "kind": "completion"}, completion_tokens)
+
+    def on_llm_error(self, error, **kwargs):
+        record = _current_node.get()
+        REGISTRY.inc("pipeline_llm_errors_total", {"node": record["node"] if record else "unknown"},
+                     help="Failed LLM calls, by graph node.")
+
+    def on_retry(self, retry_state, **kwargs):
+        record = _current_node.get()
+        with _record_lock:
+            if record is not None:
+                record["retries"] += 1
+        REGISTRY.inc("pipeline_llm_retries_total", {"node": record["node"] if record else "unknown"},
+                     help="Retried LLM calls, by graph node.")
+
+
+def _token_usage(response) -> tuple:
+    """Reads prompt/completion token counts from an LLMResult, whichever way the provider reports them."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += metadata.get("input_tokens", 0)
+            completion_tokens += metadata.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+TOKEN_USAGE_HANDLER = TokenUsageHandler()
+
+
+def instrument_node(name: str, fn):
+    """
+    Wraps a graph node so each run records its duration, LLM tokens, retries and outcome.
+    The per-run record is also appended to state['node_metrics'] for per-document reporting,
+    and published as a "node" custom stream event for progress reporting.
+    """
+    @functools.wraps(fn)
+    def wrapper(state, **kwargs):
+        record = {"node": name, "seconds": 0.0, "llm_calls": 0, "prompt_tokens": 0,
+                  "completion_tokens": 0, "retries": 0, "outcome": "ok"}
+        token = _current_node.set(record)
+        started = time.perf_counter()
+        try:
+            result = fn(state, **kwargs)
+        except Exception:
+            record["outcome"] = "error"
+            raise
+        finally:
+            _current_node.reset(token)
+            record["seconds"] = time.perf_counter() - started
+            REGISTRY.observe("pipeline_node_duration_seconds", record["seconds"], {"node": name},
+                             help="Wall time of each graph node run.")
+            REGISTRY.inc("pipeline_node_runs_total", {"node": name, "outcome": record["outcome"]},
+                         help="Graph node runs, by outcome.")
+            get_stream_writer()(dict(record, type="node"))
+        result['node_metrics'] = (result.get('node_metrics') or []) + [record]
+        return result
+    # functools.wraps exposes fn's signature, so LangGraph still passes `config` only to nodes that take it.
+    return wrapper
+
+
+def record_document(final_state: dict, outcome: str):
+    """Aggregates the per-node records of one finished document into document-level metrics."""
+    records = final_state.get('node_metrics') or []
+    seconds = sum(r["seconds"] for r in records)
+    tokens = sum(r["prompt_tokens"] + r["completion_tokens"] for r in records)
+    REGISTRY.inc("pipeline_documents_total", {"outcome": outcome}, help="Documents processed, by outcome.")
+    REGISTRY.observe("pipeline_document_duration_seconds", seconds, {"outcome": outcome},
+                     help="Total node wall time per document.")
+    REGISTRY.observe("pipeline_document_tokens", tokens, {"outcome": outcome}, buckets=TOKEN_BUCKETS,
+                     help="Total LLM tokens per document.")
+    return {"seconds": round(seconds, 4), "tokens": tokens,
+            "nodes": {r["node"]: round(r["seconds"], 4) for r in records}}
+
+
+def render_prometheus(extra_labels: tuple = ()) -> str:
+    return REGISTRY.render_prometheus(extra_labels)
+
+
+def write_metrics_file(path: str, extra_labels: tuple = ()):
+    """Atomically replaces `path` with the current metrics in Prometheus text format."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render_prometheus(extra_labels))
+    os.replace(tmp_path, path)
+
+
+def process_metrics_file(path: str, pid: int = None) -> str:
+    """
+    This process's own metrics file: METRICS_FILE with the pid before its extension
+    (metrics.prom -> metrics.1234.prom), so the app, worker.py and ingest.py never
+    overwrite each other's snapshot.
+    """
+    root, extension = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{extension}"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the application log
+
+
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+def start_metrics_exporters(port: int = METRICS_PORT, path: str = METRICS_FILE, host: str = METRICS_HOST):
+    """Starts the /metrics HTTP endpoint and/or the periodic metrics file writer, once per process."""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Typically another process sharing the same .env (the app, worker.py, ingest.py)
+            # already serves this port; metrics are still recorded and written to METRICS_FILE.
+            logger.warning("Metrics endpoint not started on %s:%d: %s", host, port, e)
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    if path:
+        path = process_metrics_file(path)
+        # Every series carries the pid as well, so a collector reading all the files sees no duplicates.
+        labels = (("pid", str(os.getpid())),)
+
+        def write_periodically():
+            while True:
+                time.sleep(METRICS_FILE_INTERVAL_SECONDS)
+                try:
+                    write_metrics_file(path, labels)
+                except Exception:
+                    logger.exception("Could not write metrics to %s", path)
+
+        def remove_file():
+            for leftover in (path, f"{path}.tmp"):
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+
+        # A finished process's file would otherwise keep reporting its last snapshot.
+        atexit.register(remove_file)
+        threading.Thread(target=write_periodically, name="metrics-file", daemon=True).start()
+
+
+def _service_stats() -> dict:
+    """Cache, classifier, near-duplicate index and connection-pool counters, exported as gauges."""
+    from services.cache import extraction_cache_stats
+    from services.database import pool_stats
+    from services.near_duplicates import near_duplicate_stats
+    from .classifier import classifier_stats
+
+    gauges = {}
+    for prefix, stats in (("extraction_cache", extraction_cache_stats()),
+                          ("resume_fastpath", classifier_stats()),
+                          ("near_duplicate_index", near_duplicate_stats()),
+                          ("db_pool", pool_stats())):
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                gauges[f"{prefix}_{key}"] = value
+    return gauges
+
+REGISTRY.register_collector(_service_stats)
@@ -1,17 +1,90 @@
 
-import streamlit as st
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 from .state import GraphState
-from .chains import structured_resume_check_llm, structured_profile_extraction_llm
-from services.database import check_if_profile_exists, insert_profile
+from . import chains
+from .classifier import classify_resume
+from .contacts import extract_contacts, apply_contact_ground_truth
+from .compaction import (
+    compact_text, estimate_tokens, split_into_chunks, merge_profiles, PROFILE_INPUT_TOKEN_BUDGET,
+    COMPACTION_VERSION
+)
+from .streaming import PROFILE_STREAMING_ENABLED, stream_profile_extraction
+from .prompts import RESUME_CHECK_PROMPT, PROFILE_EXTRACTION_PROMPT, SECTION_EXTRACTION_PROMPT
+from .schemas import IsResume, ResumeProfile
+from services.cache import get_extraction_cache, make_cache_key, schema_version
+from services.database import (
+    check_if_profile_exists, find_profile_by_emails, get_profile_by_id, upsert_profile, write_message,
+    PROFILE_CONFLICT_POLICY
+)
+from services.near_duplicates import NEAR_DUPLICATE_ENABLED, get_near_duplicate_index, minhash_signature
+
+# Cache keys include these versions, so editing a prompt or schema invalidates old entries.
+RESUME_CHECK_VERSION = schema_version(RESUME_CHECK_PROMPT, IsResume)
+PROFILE_EXTRACTION_VERSION = schema_version(
+    PROFILE_EXTRACTION_PROMPT, SECTION_EXTRACTION_PROMPT, ResumeProfile, PROFILE_INPUT_TOKEN_BUDGET,
+    COMPACTION_VERSION
+)
+
+def report_status(message: str):
+    """
+    Publishes a progress message as a custom stream event. Callers that run the graph with
+    stream_mode="custom" receive it; for plain invoke() calls it is a no-op.
+    """
+    get_stream_writer()({"type": "status", "message": message})
 
 def parse_document(state: GraphState) -> GraphState:
-    st.session_state.status_messages.append("Parsing document...")
+    report_status("Parsing document...")
+    return state
+
+def check_near_duplicate(state: GraphState, config: RunnableConfig) -> GraphState:
+    """Matches the text against stored resumes with MinHash/LSH, so revised copies end before any LLM call."""
+    state['profile_exists_in_db'] = False
+    if not NEAR_DUPLICATE_ENABLED:
+        return state
+    report_status("Checking for near-duplicate resumes...")
+    # Stored with the new row by add_to_database, so later revisions of this resume are caught too.
+    state['minhash_signature'] = minhash_signature(state['file_content'])
+    _, policy = _write_options(config)
+    if policy != "skip":
+        # Overwrite and merge are keyed on email and need the fresh extraction anyway.
+        return state
+
+    index = get_near_duplicate_index()
+    match = index.query(state['minhash_signature'])
+    if match:
+        profile_id, similarity = match
+        # A negative id is a profile queued earlier in this bulk run and not written yet.
+        existing = index.pending_profile(profile_id) if profile_id < 0 else get_profile_by_id(profile_id)
+        if existing:
+            state['near_duplicate'] = {"profile_id": profile_id if profile_id >= 0 else None,
+                                       "similarity": round(similarity, 3)}
+            state['profile_exists_in_db'] = True
+            state['existing_profile_data'] = existing
+            state['final_message'] = f"Near-duplicate of an existing profile ({similarity:.0%} similar)."
     return state
 
 def check_if_resume(state: GraphState) -> GraphState:
-    st.session_state.status_messages.append("Verifying if document is a resume...")
-    prompt = f"Analyze the text to determine if it is a resume or CV.\n\nText:\n---\n{state['file_content'][:2000]}"
-    response = structured_resume_check_llm.invoke(prompt)
+    report_status("Verifying if document is a resume...")
+    # Obvious resumes and obvious non-resumes are decided locally without an LLM round trip.
+    verdict = classify_resume(state['file_content'])
+    if verdict is not None:
+        report_status("Resume check decided by the local classifier.")
+        state['is_resume'] = verdict.is_resume
+        if not verdict.is_resume:
+            state['final_message'] = f"Document is not a resume. Reason: {verdict.reason}"
+        return state
+
+    cache = get_extraction_cache()
+    cache_key = make_cache_key(state['file_content'], RESUME_CHECK_VERSION)
+    cached = cache.get("is_resume", cache_key)
+    if cached is not None:
+        report_status("Loaded resume verdict from cache.")
+        response = IsResume(**cached)
+    else:
+        prompt = RESUME_CHECK_PROMPT.format(file_content=state['file_content'][:2000])
+        response = chains.structured_resume_check_llm.invoke(prompt)
+        cache.set("is_resume", cache_key, response.model_dump())
     state['is_resume'] = response.is_resume
     if not response.is_resume:
         state['final_message'] = f"Document is not a resume. Reason: {response.reason}"
@@ -19,54 +92,107 @@ def check_if_resume(state: GraphState) -> GraphState:
 
 def extract_profile_info(state: GraphState) -> GraphState:
     """Extracts structured information, leveraging a special section of detected hyperlinks."""
-    st.session_state.status_messages.append("Extracting detailed profile information...")
-    
-    # UPDATED: This prompt now tells the LLM to look for the special hyperlink section.
-    prompt = f"""
-    Analyze the resume text provided below to extract a comprehensive, structured profile.
-    The text may contain a special section at the end called '--- DETECTED HYPERLINKS ---'.
-    Use the URLs from that section to accurately fill in the linkedin_url, github_url, and portfolio_url fields.
-    If a specific field is not mentioned anywhere, leave its value as null.
-
-    **Extraction Requirements:**
-    - `name`, `email`, `phone_number`: Standard contact details.
-    - `summary`: A concise professional summary.
-    - `top_skills`: A list of the 5 most prominent skills.
-    
-    - **URL Fields:**
-      - `linkedin_url`: Find the LinkedIn URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
-      - `github_url`: Find the GitHub URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
-      - `portfolio_url`: Find the personal portfolio URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
-
-    - `education`: A detailed list of educational background.
-    - `work_experience`: A detailed list of work history.
-    - `latest_three_projects_and_publications`: A list of up to 3 projects or publications.
-
-    **Resume Text (including any detected links at the end):**
-    ---
-    {state['file_content']}
-    ---
-    """
-    response = structured_profile_extraction_llm.invoke(prompt)
-    state['profile_data'] = response.dict()
+    report_status("Extracting detailed profile information...")
+    cache = get_extraction_cache()
+    cache_key = make_cache_key(state['file_content'], PROFILE_EXTRACTION_VERSION)
+    cached = cache.get("profile", cache_key)
+    if cached is not None:
+        report_status("Loaded extracted profile from cache.")
+        state['token_usage'] = {"raw_input_tokens": estimate_tokens(state['file_content']), "input_tokens": 0}
+        state['profile_data'] = apply_contact_ground_truth(cached, state.get('contact_info') or {})
+        return state
+
+    # Page numbers, repeated headers/footers and extra whitespace cost tokens but carry no information.
+    compacted = compact_text(state['file_content'])
+    if estimate_tokens(compacted) <= PROFILE_INPUT_TOKEN_BUDGET:
+        # The prompt tells the LLM to look for the special hyperlink section.
+        prompts = [PROFILE_EXTRACTION_PROMPT.format(file_content=compacted)]
+    else:
+        # Too long for one prompt: extract the opening with the full prompt and the remaining
+        # sections in parallel, then merge the partial profiles.
+        chunks = split_into_chunks(compacted, PROFILE_INPUT_TOKEN_BUDGET)
+        report_status(f"Long document: extracting {len(chunks)} sections in parallel...")
+        prompts = [PROFILE_EXTRACTION_PROMPT.format(file_content=chunks[0])]
+        prompts += [SECTION_EXTRACTION_PROMPT.format(file_content=chunk) for chunk in chunks[1:]]
+
+    if len(prompts) == 1 and PROFILE_STREAMING_ENABLED:
+        # Completed fields and entries are published as they arrive; the final validation is the
+        # same as in the structured output parser, so the stored profile does not change.
+        try:
+            args = stream_profile_extraction(chains.streaming_profile_extraction_llm, prompts[0], get_stream_writer())
+            responses = [ResumeProfile.model_validate(args)]
+        except ValueError:  # No tool call, malformed JSON, or a pydantic ValidationError
+            # Escalated like invalid non-streamed output: to the next model, or once more to the only one.
+            report_status("Streamed profile was invalid; extracting it again...")
+            responses = [chains.structured_profile_extraction_llm.escalate(prompts[0])]
+    else:
+        responses = chains.structured_profile_extraction_llm.batch(prompts)
+    profile_data = merge_profiles([response.dict() for response in responses])
+    state['token_usage'] = {
+        "raw_input_tokens": estimate_tokens(state['file_content']),
+        "input_tokens": sum(estimate_tokens(prompt) for prompt in prompts),
+        "llm_calls": len(prompts),
+    }
+    cache.set("profile", cache_key, profile_data)
+    state['profile_data'] = apply_contact_ground_truth(profile_data, state.get('contact_info') or {})
+    return state
+
+def pre_extract_contacts(state: GraphState) -> GraphState:
+    """Finds the candidate's email, phone number and profile links with rules, before any extraction tokens are spent."""
+    report_status("Detecting contact details...")
+    state['contact_info'] = extract_contacts(state['file_content'])
     return state
 
-def check_database(state: GraphState) -> GraphState:
-    st.session_state.status_messages.append("Checking database for existing profile...")
-    email = state['profile_data'].get('email')
+def _write_options(config: RunnableConfig) -> tuple:
+    """Returns the bulk writer (if the caller supplied one) and the conflict policy for this run."""
+    configurable = (config or {}).get("configurable", {})
+    writer = configurable.get("profile_writer")
+    policy = writer.policy if writer else configurable.get("conflict_policy", PROFILE_CONFLICT_POLICY)
+    return writer, policy
+
+def check_database(state: GraphState, config: RunnableConfig) -> GraphState:
+    """Runs before extraction, so a known candidate ends the graph without spending extraction tokens."""
+    report_status("Checking database for existing profile...")
+    _, policy = _write_options(config)
+    state['profile_exists_in_db'] = False
+    if policy != "skip":
+        # Overwrite and merge need the fresh extraction anyway; the upsert resolves the conflict.
+        return state
+
+    email = (state.get('contact_info') or {}).get('email')
     if email:
-        result = check_if_profile_exists.invoke({"email": email})
+        result = find_profile_by_emails([email])
         state['profile_exists_in_db'] = result['exists']
         if result['exists']:
             state['existing_profile_data'] = result['profile']
             state['final_message'] = "Profile with this email already exists."
     else:
-        state['profile_exists_in_db'] = False
         state['final_message'] = "No email found in resume. Inserting new profile."
     return state
 
-def add_to_database(state: GraphState) -> GraphState:
-    st.session_state.status_messages.append("Adding new profile to database...")
-    insert_profile(state['profile_data'])
-    state['final_message'] = "Successfully extracted and added new profile to the database!"
-    return state
\ No newline at end of file
+def add_to_database(state: GraphState, config: RunnableConfig) -> GraphState:
+    report_status("Adding new profile to database...")
+    writer, policy = _write_options(config)
+    signature = state.get('minhash_signature')
+    if writer:
+        on_written = None
+        if signature is not None:
+            # Indexed right away, so a revised copy later in the same run is caught before the flush.
+            index = get_near_duplicate_index()
+            pending_id = index.add_pending(signature, state['profile_data'])
+            on_written = lambda profile_id: index.resolve_pending(pending_id, profile_id)
+        writer.add(state['profile_data'], key=state.get('source'), signature=signature, on_written=on_written)
+        state['write_status'] = "queued"
+        state['final_message'] = "Profile queued for the next bulk database write."
+        return state
+
+    state['write_status'], profile_id = upsert_profile(state['profile_data'], policy=policy, signature=signature)
+    if profile_id is not None and signature is not None:
+        # Other processes see the row at their next refresh; this one can match it right away.
+        get_near_duplicate_index().add(profile_id, signature)
+    if state['write_status'] == "skipped":
+        # Another worker inserted the same email between our lookup and this write.
+        state['profile_exists_in_db'] = True
+        state['existing_profile_data'] = check_if_profile_exists.invoke({"email": state['profile_data']['email']})['profile']
+    state['final_message'] = write_message(state['write_status'], policy)
+    return state
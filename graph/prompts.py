@@ -0,0 +1,46 @@
+# Prompt templates used by the graph nodes.
+# They live at module level so the extraction cache can version its keys on them.
+
+RESUME_CHECK_PROMPT = "Analyze the text to determine if it is a resume or CV.\n\nText:\n---\n{file_content}"
+
+PROFILE_EXTRACTION_PROMPT = """
+    Analyze the resume text provided below to extract a comprehensive, structured profile.
+    The text may contain a special section at the end called '--- DETECTED HYPERLINKS ---'.
+    Use the URLs from that section to accurately fill in the linkedin_url, github_url, and portfolio_url fields.
+    If a specific field is not mentioned anywhere, leave its value as null.
+
+    **Extraction Requirements:**
+    - `name`, `email`, `phone_number`: Standard contact details.
+    - `summary`: A concise professional summary.
+    - `top_skills`: A list of the 5 most prominent skills.
+
+    - **URL Fields:**
+      - `linkedin_url`: Find the LinkedIn URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
+      - `github_url`: Find the GitHub URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
+      - `portfolio_url`: Find the personal portfolio URL. Prioritize the list in the 'DETECTED HYPERLINKS' section.
+
+    - `education`: A detailed list of educational background.
+    - `work_experience`: A detailed list of work history.
+    - `latest_three_projects_and_publications`: A list of up to 3 projects or publications.
+
+    **Resume Text (including any detected links at the end):**
+    ---
+    {file_content}
+    ---
+    """
+
+# Used for the later chunks of documents too long for a single extraction prompt.
+SECTION_EXTRACTION_PROMPT = """
+    The text below is one part of a longer resume; other parts are processed separately.
+    Extract only the entries that appear in this part:
+    - `education`: Every educational entry.
+    - `work_experience`: Every work history entry.
+    - `latest_three_projects_and_publications`: Projects or publications, most recent first.
+    - `top_skills`: Skills that are prominent in this part.
+    Leave contact details, name and summary as null unless they appear in this part.
+
+    **Resume Part:**
+    ---
+    {file_content}
+    ---
+    """
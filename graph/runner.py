@@ -0,0 +1,176 @@
+"""
+Runs uploaded documents through the graph outside the Streamlit script thread.
+
+Uploads are submitted to the job queue in services/job_queue.py. A JobWorkerPool
+claims jobs, streams each one through the graph and stores the custom progress
+events (one per report_status() call and one per finished node) and the final
+result, which the uploader polls. The pool can run embedded in the Streamlit
+server or as a separate process with `python worker.py`.
+
+The graph and its dependencies are imported by the worker threads on their first
+job, so starting a pool does not slow down the page that starts it.
+"""
+import os
+import time
+import socket
+import logging
+import threading
+from services import job_queue
+from services.file_parser import parse_document_bytes
+from .state import GraphState
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+# Worker threads started inside the Streamlit server; 0 leaves all processing to `python worker.py`.
+JOB_EMBEDDED_WORKERS = int(os.getenv('JOB_EMBEDDED_WORKERS', str(JOB_WORKERS)))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv('JOB_POLL_INTERVAL_SECONDS', '0.5'))
+
+
+def document_outcome(final_state: dict) -> str:
+    """Maps a final graph state onto a document outcome for metrics and display."""
+    if final_state.get('is_resume') == False:
+        return "not_resume"
+    if final_state.get('profile_exists_in_db'):
+        return "duplicate"
+    return final_state.get('write_status') or "inserted"
+
+
+def run_document(graph_app, file_name: str, data: bytes, on_event, config: dict = None) -> dict:
+    """
+    Parses one document and streams it through the graph, passing every progress event to
+    on_event(event). Returns a JSON-serialisable summary of the run.
+    """
+    from .instrumentation import record_document
+
+    parsed = parse_document_bytes(data, file_name)
+    on_event({"type": "parsed", "page_count": parsed.page_count, "pages_parsed": parsed.pages_parsed,
+              "truncated": parsed.truncated, "seconds": round(parsed.parse_seconds, 4)})
+    if not parsed.text.strip():
+        return {"outcome": "failed", "final_message": "Failed to extract text from file."}
+
+    final_state = None
+    initial_state = GraphState(file_content=parsed.text, source=file_name)
+    for mode, chunk in graph_app.stream(initial_state, config=config, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            on_event(chunk)
+        else:
+            final_state = chunk
+
+    outcome = document_outcome(final_state)
+    return {
+        "outcome": outcome,
+        "final_message": final_state.get('final_message', "Processing complete."),
+        "is_resume": final_state.get('is_resume'),
+        "profile_exists_in_db": final_state.get('profile_exists_in_db'),
+        "profile_data": final_state.get('profile_data'),
+        "existing_profile_data": final_state.get('existing_profile_data'),
+        "near_duplicate": final_state.get('near_duplicate'),
+        "token_usage": final_state.get('token_usage'),
+        "metrics": record_document(final_state, outcome),
+    }
+
+
+class JobWorkerPool:
+    """
+    A fixed set of daemon threads that process queued jobs until stopped.
+    Without a graph_app, the shared compiled graph is used (see graph.graph.get_app).
+    """
+
+    def __init__(self, graph_app=None, workers: int = JOB_WORKERS, poll_interval: float = JOB_POLL_INTERVAL_SECONDS):
+        self.graph_app = graph_app
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+        self._active = {}  # job id -> claimed job, kept alive by the heartbeat thread
+        self._active_lock = threading.Lock()
+
+    def start(self):
+        # Jobs left running by a worker that died are picked up again.
+        requeued = job_queue.requeue_stale_jobs()
+        if requeued:
+            logger.info("Re-queued %d stale jobs", requeued)
+        job_queue.prune_finished_jobs()
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(f"{socket.gethostname()}:{os.getpid()}:{n}",),
+                                      name=f"job-worker-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._heartbeat, name="job-heartbeat", daemon=True).start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Lets each worker finish its current job, then joins the threads."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _work(self, worker_id: str):
+        while not self._stop.is_set():
+            try:
+                job = job_queue.claim_job(worker_id)
+            except Exception:
+                logger.exception("Could not claim a job")
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            with self._active_lock:
+                self._active[job["id"]] = job
+            try:
+                self.process(job)
+            finally:
+                with self._active_lock:
+                    self._active.pop(job["id"], None)
+
+    def _heartbeat(self):
+        # Jobs waiting on a slow or rate-limited LLM publish no events for a while; the heartbeat
+        # keeps requeue_stale_jobs() from handing them to a second worker meanwhile.
+        while not self._stop.wait(job_queue.JOB_HEARTBEAT_SECONDS):
+            with self._active_lock:
+                jobs = list(self._active.values())
+            for job in jobs:
+                try:
+                    if not job_queue.heartbeat(job):
+                        logger.warning("Job %s was re-queued while still running here; its result will be dropped",
+                                       job["id"])
+                        with self._active_lock:
+                            self._active.pop(job["id"], None)
+                except Exception:
+                    logger.exception("Could not record the heartbeat of job %s", job["id"])
+
+    def process(self, job: dict):
+        from .graph import get_app
+        from .instrumentation import REGISTRY
+
+        job_id = job["id"]
+        started = time.perf_counter()
+        try:
+            result = run_document(self.graph_app or get_app(), job["file_name"], job["payload"],
+                                  lambda event: job_queue.add_event(job, event))
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            job_queue.fail_job(job, f"{type(e).__name__}: {e}")
+            REGISTRY.inc("pipeline_jobs_total", {"status": job_queue.FAILED}, help="Queued jobs processed, by status.")
+            return
+        if not job_queue.complete_job(job, result):
+            logger.warning("Job %s was re-queued before it finished here; keeping the newer attempt", job_id)
+            return
+        REGISTRY.inc("pipeline_jobs_total", {"status": job_queue.DONE}, help="Queued jobs processed, by status.")
+        REGISTRY.observe("pipeline_job_duration_seconds", time.perf_counter() - started,
+                         help="Wall time of each queued job, including parsing.")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def start_worker_pool(workers: int = JOB_WORKERS) -> JobWorkerPool:
+    """Starts the process-wide worker pool on first call."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = JobWorkerPool(workers=workers).start()
+    return _pool
@@ -40,4 +40,5 @@ class ResumeProfile(BaseModel):
     # Nested lists of our new models
     education: Optional[List[Education]] = Field(default=None, description="A list of the person's educational background.")
     work_experience: Optional[List[WorkExperience]] = Field(default=None, description="A list of the person's work experience.")
+    latest_three_projects_and_publications: Optional[List[str]] = Field(default=None, description="Up to 3 of the person's most recent projects or publications.")
     
\ No newline at end of file
@@ -4,8 +4,15 @@ from typing import Optional
 class GraphState(dict):
     """Defines the state for our LangGraph workflow."""
     file_content: str
+    source: Optional[str]
+    minhash_signature: Optional[list]
+    near_duplicate: Optional[dict]
     is_resume: bool
+    contact_info: dict
     profile_data: dict
+    token_usage: Optional[dict]
     profile_exists_in_db: bool
     existing_profile_data: Optional[dict]
+    write_status: Optional[str]
+    node_metrics: Optional[list]
     final_message: str
\ No newline at end of file
@@ -0,0 +1,216 @@
+"""
+Headless bulk ingestion of resumes through the LangGraph pipeline.
+
+Usage:
+    uv run python ingest.py ./resumes --concurrency 8 --report ingest_report.ndjson
+    uv run python ingest.py --manifest files.txt --report ingest_report.ndjson
+
+Every processed file gets one NDJSON line in the report. Re-running the same
+command skips files that already finished, so an interrupted run can be resumed.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+load_dotenv()
+
+from services.file_parser import parse_file
+from services.database import (pool_stats, write_message, ProfileBulkWriter, CONFLICT_POLICIES,
+                               PROFILE_CONFLICT_POLICY)
+from graph.state import GraphState
+from graph.instrumentation import record_document
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Report statuses. Everything except "failed" is final and skipped on resume.
+INSERTED = "inserted"
+UPDATED = "updated"
+DUPLICATE = "duplicate"
+NOT_RESUME = "not_resume"
+FAILED = "failed"
+FINAL_STATUSES = {INSERTED, UPDATED, DUPLICATE, NOT_RESUME}
+
+# Maps the database write outcome onto a report status.
+WRITE_STATUSES = {"inserted": INSERTED, "updated": UPDATED, "skipped": DUPLICATE, "failed": FAILED}
+
+
+def discover_files(directory: str = None, manifest: str = None) -> list:
+    """Collects the files to ingest from a directory tree and/or a manifest with one path per line."""
+    paths = []
+    if directory:
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    paths.append(os.path.join(root, name))
+    if manifest:
+        with open(manifest, encoding='utf-8') as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return sorted(set(paths))
+
+
+def load_completed(report_path: str) -> set:
+    """Returns the files that already reached a final status in a previous run."""
+    completed = set()
+    if not os.path.exists(report_path):
+        return completed
+    with open(report_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # A line cut short by an interruption
+            if record.get('status') in FINAL_STATUSES:
+                completed.add(record['path'])
+            else:
+                completed.discard(record.get('path'))
+    return completed
+
+
+def classify_result(final_state: dict) -> str:
+    """Maps the final graph state onto a report status ("queued" while a bulk write is pending)."""
+    if final_state.get('is_resume') == False:
+        return NOT_RESUME
+    if final_state.get('profile_exists_in_db'):
+        return DUPLICATE
+    if final_state.get('write_status') == "queued":
+        return "queued"
+    return WRITE_STATUSES.get(final_state.get('write_status'), INSERTED)
+
+
+def parse_path(path: str):
+    with open(path, 'rb') as f:
+        # parse_file only needs .name and .read(), which a plain file object provides.
+        return parse_file(f)
+
+
+async def ingest_file(graph_app, path: str, config: dict) -> dict:
+    """Parses one file and runs it through the graph, never raising."""
+    started = time.perf_counter()
+    record = {"path": path}
+    try:
+        parsed = await asyncio.to_thread(parse_path, path)
+        file_text = parsed.text
+        record.update(pages=parsed.page_count, parse_seconds=round(parsed.parse_seconds, 3))
+        if not file_text.strip():
+            record.update(status=FAILED, message="Failed to extract text from file.")
+        else:
+            final_state = await graph_app.ainvoke(GraphState(file_content=file_text, source=path), config=config)
+            status = classify_result(final_state)
+            record.update(
+                status=status,
+                message=final_state.get('final_message'),
+                email=(final_state.get('profile_data') or {}).get('email'),
+                token_usage=final_state.get('token_usage'),
+                metrics=record_document(final_state, status),
+            )
+    except Exception as e:
+        record.update(status=FAILED, message=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+async def run_ingestion(graph_app, paths: list, report_path: str, concurrency: int,
+                        policy: str = PROFILE_CONFLICT_POLICY, write_batch_size: int = 1) -> dict:
+    """Drives the graph over all paths with at most `concurrency` documents in flight."""
+    # Sync graph nodes run on the loop's default executor, so size it to the concurrency limit.
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=concurrency * 2))
+
+    # With a batch size above 1, profiles are written with one multi-row upsert per batch.
+    writer = ProfileBulkWriter(policy=policy, batch_size=write_batch_size) if write_batch_size > 1 else None
+    config = {"configurable": {"profile_writer": writer, "conflict_policy": policy}}
+
+    queue = asyncio.Queue()
+    for path in paths:
+        queue.put_nowait(path)
+    counts = {INSERTED: 0, UPDATED: 0, DUPLICATE: 0, NOT_RESUME: 0, FAILED: 0}
+    queued = {}         # path -> record waiting for its bulk write to be flushed
+    write_results = {}  # path -> write outcome that arrived before its record
+
+    with open(report_path, 'a', encoding='utf-8') as report:
+        def write_record(record):
+            counts[record['status']] += 1
+            report.write(json.dumps(record) + "\n")
+            report.flush()
+
+        def settle(path):
+            # Records are only reported once their row is committed, so a resumed run redoes unflushed files.
+            if path in queued and path in write_results:
+                record, write_status = queued.pop(path), write_results.pop(path)
+                record['status'] = WRITE_STATUSES[write_status]
+                record['message'] = write_message(write_status, policy)
+                write_record(record)
+
+        def collect_flushed():
+            # Another worker's add() may flush this file's profile before its graph run has returned.
+            for path, write_status in writer.drain_results().items():
+                write_results[path] = write_status
+                settle(path)
+
+        async def worker():
+            while not queue.empty():
+                path = queue.get_nowait()
+                record = await ingest_file(graph_app, path, config)
+                if record['status'] == "queued":
+                    queued[path] = record
+                    settle(path)
+                else:
+                    write_record(record)
+                if writer:
+                    collect_flushed()
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        if writer:
+            await asyncio.to_thread(writer.flush)
+            collect_flushed()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes into the profile database.")
+    parser.add_argument("directory", nargs="?", help="Directory to scan for .pdf, .docx and .txt files.")
+    parser.add_argument("--manifest", help="Text file listing one file path per line.")
+    parser.add_argument("--report", default="ingest_report.ndjson", help="NDJSON report file (appended to).")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv('INGEST_CONCURRENCY', '4')),
+                        help="Maximum number of documents processed at once.")
+    parser.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default=PROFILE_CONFLICT_POLICY,
+                        help="What to do when a profile with the same email already exists.")
+    parser.add_argument("--write-batch-size", type=int, default=int(os.getenv('PROFILE_WRITE_BATCH_SIZE', '50')),
+                        help="Profiles per bulk database write; 1 writes each profile as soon as it is extracted.")
+    args = parser.parse_args(argv)
+
+    if not args.directory and not args.manifest:
+        parser.error("Provide a directory, a --manifest, or both.")
+
+    paths = discover_files(args.directory, args.manifest)
+    completed = load_completed(args.report)
+    pending = [p for p in paths if p not in completed]
+    print(f"Found {len(paths)} files, {len(completed & set(paths))} already done, {len(pending)} to process.",
+          file=sys.stderr)
+    if not pending:
+        return 0
+
+    from graph.graph import get_app
+    graph_app = get_app()
+
+    started = time.perf_counter()
+    counts = asyncio.run(run_ingestion(graph_app, pending, args.report, max(1, args.concurrency),
+                                       policy=args.on_conflict, write_batch_size=args.write_batch_size))
+    elapsed = time.perf_counter() - started
+
+    summary = ", ".join(f"{status}={count}" for status, count in counts.items())
+    print(f"Processed {len(pending)} files in {elapsed:.1f}s "
+          f"({len(pending) / elapsed * 60:.1f} docs/min): {summary}", file=sys.stderr)
+    db_stats = pool_stats()
+    if db_stats:
+        print(f"DB pool: {db_stats['borrows']} borrows, peak {db_stats['peak_in_use']}/{db_stats['max_size']} in use, "
+              f"avg wait {db_stats['wait_seconds_avg'] * 1000:.1f}ms, max wait {db_stats['wait_seconds_max'] * 1000:.1f}ms",
+              file=sys.stderr)
+    return 1 if counts[FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# --- Configuration ---
+# The cache lives in a local SQLite file so it survives app restarts and is
+# shared by every process running on the same machine.
+CACHE_PATH = os.getenv('EXTRACTION_CACHE_PATH', os.path.join('.cache', 'extraction_cache.sqlite3'))
+CACHE_MAX_ENTRIES = int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', '10000'))
+CACHE_TTL_SECONDS = int(os.getenv('EXTRACTION_CACHE_TTL_SECONDS', str(30 * 24 * 3600)))
+
+
+def normalize_content(text: str) -> str:
+    """Collapses whitespace so trivially re-encoded copies of a file share a cache key."""
+    return " ".join(text.split())
+
+
+def schema_version(*parts) -> str:
+    """
+    Builds a short version tag from prompt templates and Pydantic schemas.
+    Any change to a prompt or to a schema's fields produces a new version,
+    so stale results are never served after the extraction logic changes.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if hasattr(part, 'model_json_schema'):
+            part = json.dumps(part.model_json_schema(), sort_keys=True)
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()[:16]
+
+
+def make_cache_key(file_content: str, version: str) -> str:
+    """Content-addressed key: hash of the normalized text plus the prompt/schema version."""
+    payload = f"{version}\0{normalize_content(file_content)}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ExtractionCache:
+    """A bounded, persistent key/value store for LLM results with LRU and TTL eviction."""
+
+    def __init__(self, path: str = CACHE_PATH, max_entries: int = CACHE_MAX_ENTRIES,
+                 ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "writes": 0}
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                cache_key TEXT NOT NULL,
+                namespace TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, cache_key)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+
+    def get(self, namespace: str, key: str):
+        """Returns the cached dict for a key, or None on a miss or an expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE namespace = ? AND cache_key = ?",
+                (namespace, key)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE namespace = ? AND cache_key = ?", (namespace, key))
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE llm_cache SET last_access = ? WHERE namespace = ? AND cache_key = ?",
+                (now, namespace, key)
+            )
+            self._stats["hits"] += 1
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: dict):
+        """Stores a result and evicts the least recently used entries beyond the size bound."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (cache_key, namespace, value, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, json.dumps(value), now, now)
+            )
+            self._stats["writes"] += 1
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE rowid IN "
+                    "(SELECT rowid FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+                self._stats["evictions"] += overflow
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        """Returns the hit/miss counters for this process plus the current number of entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            stats = dict(self._stats, size=size, max_entries=self.max_entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_extraction_cache() -> ExtractionCache:
+    """Returns the process-wide cache, opening the SQLite file on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExtractionCache()
+    return _cache
+
+def extraction_cache_stats() -> dict:
+    """Counters of the process-wide cache, or {} if it has not been used yet."""
+    return _cache.stats() if _cache is not None else {}
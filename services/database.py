@@ -1,77 +1,646 @@
-
 import os
 import json
+import time
+import datetime
+import threading
+from contextlib import contextmanager
 import psycopg2
 from psycopg2 import sql
-from langchain.tools import tool
+from psycopg2 import pool as pg_pool
+from psycopg2 import extensions as pg_extensions
+from psycopg2.extras import execute_values
+from langchain_core.tools import tool
+
+# --- Connection Pool Configuration ---
+DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+# Seconds to wait for a free connection before giving up.
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Connections idle for longer than this are pinged before being handed out.
+DB_POOL_HEALTHCHECK_AFTER = float(os.getenv('DB_POOL_HEALTHCHECK_AFTER', '30'))
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available within the timeout."""
+
+
+class ConnectionPool:
+    """
+    A process-wide, thread-safe pool of PostgreSQL connections.
+    Borrowers block (up to a timeout) when every connection is in use, and
+    connections that went stale while idle are transparently replaced.
+    """
+
+    def __init__(self, dsn: str, min_size: int = DB_POOL_MIN_SIZE, max_size: int = DB_POOL_MAX_SIZE,
+                 timeout: float = DB_POOL_TIMEOUT, healthcheck_after: float = DB_POOL_HEALTHCHECK_AFTER):
+        self._pool = pg_pool.ThreadedConnectionPool(min_size, max_size, dsn)
+        # ThreadedConnectionPool raises instead of waiting when exhausted; the semaphore makes callers queue.
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._last_used = {}
+        self.max_size = max_size
+        self.timeout = timeout
+        self.healthcheck_after = healthcheck_after
+        self._stats = {
+            "borrows": 0, "in_use": 0, "peak_in_use": 0, "timeouts": 0, "reconnects": 0,
+            "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+        }
+
+    def getconn(self):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats["timeouts"] += 1
+            raise PoolTimeout(f"No database connection available after {self.timeout}s")
+        try:
+            # Every idle connection may have gone stale (e.g. after a database restart); each one
+            # that fails the check is closed, so at most max_size of them come back before a new one.
+            for _ in range(self.max_size + 1):
+                conn = self._pool.getconn()
+                if self._is_healthy(conn):
+                    break
+                self._last_used.pop(id(conn), None)
+                self._pool.putconn(conn, close=True)
+                with self._lock:
+                    self._stats["reconnects"] += 1
+            else:
+                raise psycopg2.OperationalError("No healthy database connection could be opened")
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._stats["borrows"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+        return conn
+
+    def putconn(self, conn):
+        try:
+            status = conn.info.transaction_status if not conn.closed else None
+            broken = status is None or status == pg_extensions.TRANSACTION_STATUS_UNKNOWN
+            if not broken and status != pg_extensions.TRANSACTION_STATUS_IDLE:
+                # Never hand the next borrower a connection with an open or failed transaction.
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True  # E.g. the server dropped the connection mid-transaction
+            if broken:
+                self._last_used.pop(id(conn), None)
+            else:
+                self._last_used[id(conn)] = time.monotonic()
+            self._pool.putconn(conn, close=broken)
+        finally:
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def _is_healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        last_used = self._last_used.get(id(conn))
+        if last_used is not None and time.monotonic() - last_used < self.healthcheck_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
 
-def create_db_connection():
-    """Creates a connection to the PostgreSQL database."""
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, max_size=self.max_size)
+        stats["wait_seconds_avg"] = stats["wait_seconds_total"] / stats["borrows"] if stats["borrows"] else 0.0
+        return stats
+
+    def close(self):
+        self._pool.closeall()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    """Returns the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(os.getenv('POSTGRES_CONNECTION_STRING'))
+    return _pool
+
+def pool_stats() -> dict:
+    """Connection usage and wait-time counters for the process-wide pool."""
+    return _pool.stats() if _pool is not None else {}
+
+def _borrow_connection():
     try:
-        return psycopg2.connect(os.getenv('POSTGRES_CONNECTION_STRING'))
-    except psycopg2.Error as e:
+        db_pool = get_pool()
+        return db_pool, db_pool.getconn()
+    except (psycopg2.Error, PoolTimeout) as e:
         print(f"Error connecting to PostgreSQL: {e}")
-        return None
+        return None, None
+
+@contextmanager
+def get_connection():
+    """Borrows a pooled connection. Yields None if the database is unreachable."""
+    db_pool, conn = _borrow_connection()
+    try:
+        yield conn
+    finally:
+        if conn: db_pool.putconn(conn)
+
+# Columns used only by the pipeline itself, left out of profiles returned to callers.
+INTERNAL_COLUMNS = {"minhash_signature"}
+
+def _profile_from_row(cur, row) -> dict:
+    return {desc[0]: value for desc, value in zip(cur.description, row) if desc[0] not in INTERNAL_COLUMNS}
 
 @tool
 def check_if_profile_exists(email: str) -> dict:
     """Checks if a profile with the given email already exists in the database."""
     if not email: return {"exists": False, "profile": None}
-    conn = create_db_connection()
-    if not conn: return {"exists": False, "profile": None}
-    
-    try:
+    with get_connection() as conn:
+        if not conn: return {"exists": False, "profile": None}
         with conn.cursor() as cur:
             cur.execute("SELECT * FROM prism_table WHERE email = %s", (email,))
             result = cur.fetchone()
             if result:
-                profile = dict(zip([desc[0] for desc in cur.description], result))
+                profile = _profile_from_row(cur, result)
                 return {"exists": True, "profile": profile}
             return {"exists": False, "profile": None}
-    finally:
-        if conn: conn.close()
 
+def find_profile_by_emails(emails: list) -> dict:
+    """Looks up a profile matching any of the given emails with a single indexed query."""
+    candidates = sorted({e for email in emails if email for e in (email, email.lower())})
+    if not candidates: return {"exists": False, "profile": None}
+    with get_connection() as conn:
+        if not conn: return {"exists": False, "profile": None}
+        with conn.cursor() as cur:
+            cur.execute("SELECT * FROM prism_table WHERE email = ANY(%s) LIMIT 1", (candidates,))
+            result = cur.fetchone()
+            if result:
+                profile = _profile_from_row(cur, result)
+                return {"exists": True, "profile": profile}
+            return {"exists": False, "profile": None}
 
-def insert_profile(profile_data: dict):
-    """Inserts a new profile into the database, including structured data."""
-    conn = create_db_connection()
-    if not conn: return
-    try:
+def get_profile_by_id(profile_id: int):
+    """Returns the stored profile with the given id, or None."""
+    with get_connection() as conn:
+        if not conn: return None
         with conn.cursor() as cur:
-           
-            query = sql.SQL("""
-                INSERT INTO prism_table (
-                    email, name, summary, top_area_of_expertise, 
-                     latest_projects_and_publications,
-                    phone_number, linkedin_url, education, work_experience, github_url, portfolio_url
-                )
-                VALUES (%s,  %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """)
-            cur.execute(query, (
-                profile_data.get('email'),
-                profile_data.get('name'),
-                profile_data.get('summary'),
-                json.dumps(profile_data.get('top_skills') or []),
-                json.dumps(profile_data.get('latest_three_projects_and_publications') or []),
-                
-                profile_data.get('phone_number'),
-                profile_data.get('linkedin_url'),
-                json.dumps(profile_data.get('education') or []), # Convert list of dicts to JSON string
-                json.dumps(profile_data.get('work_experience') or []),# Convert list of dicts to JSON string
-                profile_data.get('github_url'),
-                profile_data.get('portfolio_url')
-            ))
-            conn.commit()
-    finally:
-        if conn: conn.close()
+            cur.execute("SELECT * FROM prism_table WHERE id = %s", (profile_id,))
+            result = cur.fetchone()
+            return _profile_from_row(cur, result) if result else None
 
-def get_all_professors():
-    """Retrieves all professors from the database."""
-    conn = create_db_connection()
-    if not conn: return []
-    try:
+# --- Write Path ---
+# What to do when a profile with the same email already exists:
+#   skip      - keep the stored row untouched
+#   overwrite - replace every column with the new values
+#   merge     - keep stored values the new profile lacks and union the JSONB lists
+CONFLICT_POLICIES = ("skip", "overwrite", "merge")
+PROFILE_CONFLICT_POLICY = os.getenv('PROFILE_CONFLICT_POLICY', 'skip')
+PROFILE_WRITE_BATCH_SIZE = int(os.getenv('PROFILE_WRITE_BATCH_SIZE', '50'))
+
+PROFILE_COLUMNS = (
+    "email", "name", "summary", "top_area_of_expertise", "latest_projects_and_publications",
+    "phone_number", "linkedin_url", "education", "work_experience", "github_url", "portfolio_url",
+    "minhash_signature",
+)
+JSONB_COLUMNS = {"top_area_of_expertise", "latest_projects_and_publications", "education", "work_experience"}
+
+
+def _profile_row(profile_data: dict, signature: list = None) -> tuple:
+    """
+    Maps an extracted profile onto PROFILE_COLUMNS, serializing the list fields as JSON.
+    `signature` is the MinHash signature of the source text (see services/near_duplicates.py).
+    """
+    return (
+        profile_data.get('email'),
+        profile_data.get('name'),
+        profile_data.get('summary'),
+        json.dumps(profile_data.get('top_skills') or []),
+        json.dumps(profile_data.get('latest_three_projects_and_publications') or []),
+        profile_data.get('phone_number'),
+        profile_data.get('linkedin_url'),
+        json.dumps(profile_data.get('education') or []), # Convert list of dicts to JSON string
+        json.dumps(profile_data.get('work_experience') or []),# Convert list of dicts to JSON string
+        profile_data.get('github_url'),
+        profile_data.get('portfolio_url'),
+        signature,
+    )
+
+
+def _merge_expression(column: str) -> sql.Composable:
+    col = sql.Identifier(column)
+    if column in JSONB_COLUMNS:
+        # Union of both arrays, de-duplicated, keeping the order in which entries first appear.
+        return sql.SQL("""(
+            SELECT COALESCE(jsonb_agg(item ORDER BY position), '[]'::jsonb) FROM (
+                SELECT item, MIN(position) AS position
+                FROM jsonb_array_elements(
+                    COALESCE(prism_table.{col}, '[]'::jsonb) || COALESCE(EXCLUDED.{col}, '[]'::jsonb)
+                ) WITH ORDINALITY AS elements(item, position)
+                GROUP BY item
+            ) AS merged
+        )""").format(col=col)
+    return sql.SQL("COALESCE(EXCLUDED.{col}, prism_table.{col})").format(col=col)
+
+
+def _upsert_query(policy: str) -> sql.Composable:
+    """Builds the INSERT ... ON CONFLICT (email) statement for a conflict policy."""
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy {policy!r}; expected one of {CONFLICT_POLICIES}")
+    if policy == "skip":
+        conflict = sql.SQL("DO NOTHING")
+    else:
+        assignments = []
+        for column in PROFILE_COLUMNS[1:]:
+            # A write without a signature never discards the stored one.
+            value = (sql.SQL("EXCLUDED.{}").format(sql.Identifier(column))
+                     if policy == "overwrite" and column not in INTERNAL_COLUMNS
+                     else _merge_expression(column))
+            assignments.append(sql.SQL("{} = {}").format(sql.Identifier(column), value))
+        assignments.append(sql.SQL("updated_at = CURRENT_TIMESTAMP"))
+        conflict = sql.SQL("DO UPDATE SET {}").format(sql.SQL(", ").join(assignments))
+    # xmax is 0 only for freshly inserted rows, which tells inserts and updates apart.
+    return sql.SQL("""
+        INSERT INTO prism_table ({columns}) VALUES %s
+        ON CONFLICT (email) {conflict}
+        RETURNING id, email, (xmax = 0) AS inserted
+    """).format(columns=sql.SQL(", ").join(map(sql.Identifier, PROFILE_COLUMNS)), conflict=conflict)
+
+
+def write_message(write_status: str, policy: str) -> str:
+    """The user-facing message for a write outcome, shared by the graph and bulk ingestion."""
+    if write_status == "skipped":
+        return "Profile with this email already exists."
+    if write_status == "failed":
+        return "Could not write the profile: the database is unreachable."
+    if write_status == "updated":
+        return f"Updated the existing profile using the '{policy}' policy."
+    return "Successfully extracted and added new profile to the database!"
+
+
+def _write_rows(conn, rows: list, policy: str) -> list:
+    """Upserts rows in a single statement and returns (id, email, inserted) for every row written."""
+    with conn.cursor() as cur:
+        returned = execute_values(cur, _upsert_query(policy).as_string(conn), rows,
+                                  page_size=max(len(rows), 1), fetch=True)
+    conn.commit()
+    return returned
+
+
+def upsert_profile(profile_data: dict, policy: str = None, signature: list = None) -> tuple:
+    """
+    Atomically writes one profile, resolving email conflicts with the given policy.
+    Returns (status, row id): status is "inserted", "updated", "skipped" (email already
+    present) or "failed", and the id is None unless the row was written.
+    """
+    policy = policy or PROFILE_CONFLICT_POLICY
+    with get_connection() as conn:
+        if not conn: return "failed", None
+        returned = _write_rows(conn, [_profile_row(profile_data, signature)], policy)
+    if not returned:
+        return "skipped", None
+    invalidate_listing_cache()
+    profile_id, _, inserted = returned[0]
+    return ("inserted" if inserted else "updated"), profile_id
+
+
+class ProfileBulkWriter:
+    """
+    Accumulates extracted profiles and writes them with one multi-row upsert per batch.
+    Each profile is added under a caller-chosen key (e.g. the source file path);
+    the outcome for each key is collected with drain_results() after a flush.
+    """
+
+    def __init__(self, policy: str = None, batch_size: int = PROFILE_WRITE_BATCH_SIZE):
+        self.policy = policy or PROFILE_CONFLICT_POLICY
+        if self.policy not in CONFLICT_POLICIES:
+            raise ValueError(f"Unknown conflict policy {self.policy!r}; expected one of {CONFLICT_POLICIES}")
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._results = {}
+
+    def add(self, profile_data: dict, key=None, signature: list = None, on_written=None):
+        """
+        Queues a profile, flushing automatically once a full batch has accumulated.
+        After the flush, on_written is called with the row id, or with None if nothing was written.
+        """
+        with self._lock:
+            self._pending.append((key, profile_data, signature, on_written))
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self) -> dict:
+        """Writes every queued profile in one transaction and returns {key: status} for them."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return {}
+
+        # One statement cannot touch the same email twice, so the last profile per email wins.
+        last_index_by_email = {}
+        for index, (_, profile, _, _) in enumerate(batch):
+            if profile.get('email'):
+                last_index_by_email[profile['email']] = index
+        rows, results = [], {}
+        for index, (key, profile, signature, _) in enumerate(batch):
+            email = profile.get('email')
+            if email and last_index_by_email[email] != index:
+                results[key] = "skipped"
+            else:
+                rows.append(_profile_row(profile, signature))
+
+        try:
+            with get_connection() as conn:
+                returned = _write_rows(conn, rows, self.policy) if conn else None
+        except psycopg2.Error as e:
+            print(f"Error writing profile batch to PostgreSQL: {e}")
+            returned = None
+
+        if returned:
+            invalidate_listing_cache()
+        written = {email: (profile_id, "inserted" if inserted else "updated")
+                   for profile_id, email, inserted in (returned or []) if email}
+        for key, profile, _, on_written in batch:
+            email, profile_id = profile.get('email'), None
+            if key in results:
+                pass
+            elif returned is None:
+                results[key] = "failed"
+            elif not email:
+                results[key] = "inserted"  # NULL emails never conflict; their ids are not matched up
+            else:
+                profile_id, results[key] = written.get(email, (None, "skipped"))
+            if on_written:
+                on_written(profile_id)
+
+        with self._lock:
+            self._results.update(results)
+        return results
+
+    def drain_results(self) -> dict:
+        """Returns and forgets the outcomes of every profile flushed so far."""
+        with self._lock:
+            results, self._results = self._results, {}
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+# --- Near-duplicate signatures ---
+MINHASH_LOAD_BATCH_SIZE = 5000
+
+def load_minhash_signatures(after: tuple = None, limit: int = MINHASH_LOAD_BATCH_SIZE) -> list:
+    """
+    Returns up to `limit` (id, signature, updated_at) rows of signed profiles in (updated_at, id)
+    order, starting after the (updated_at, id) position `after`. Rows whose signature was
+    rewritten come back again, since every write moves updated_at.
+    """
+    with get_connection() as conn:
+        if not conn: return []
         with conn.cursor() as cur:
-            cur.execute("SELECT name, email FROM prism_table")
-            return [{"name": row[0], "email": row[1]} for row in cur.fetchall()]
-    finally:
-        if conn: conn.close()
\ No newline at end of file
+            if after is None:
+                cur.execute("SELECT id, minhash_signature, updated_at FROM prism_table "
+                            "WHERE minhash_signature IS NOT NULL ORDER BY updated_at, id LIMIT %s", (limit,))
+            else:
+                cur.execute("SELECT id, minhash_signature, updated_at FROM prism_table "
+                            "WHERE (updated_at, id) > (%s, %s) AND minhash_signature IS NOT NULL "
+                            "ORDER BY updated_at, id LIMIT %s", (*after, limit))
+            return cur.fetchall()
+
+def store_minhash_signatures(pairs: list, overwrite: bool = False) -> int:
+    """Sets the signature of the rows matching each (email, signature) pair; returns the rows updated."""
+    if not pairs: return 0
+    with get_connection() as conn:
+        if not conn: return 0
+        with conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE prism_table SET minhash_signature = data.signature, updated_at = CURRENT_TIMESTAMP
+                FROM (VALUES %s) AS data (email, signature)
+                WHERE lower(prism_table.email) = lower(data.email)
+            """ + ("" if overwrite else " AND prism_table.minhash_signature IS NULL"),
+                pairs, template="(%s, %s::bigint[])", page_size=len(pairs))
+            updated = cur.rowcount
+        conn.commit()
+    return updated
+
+# --- Export ---
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', '2000'))
+# How far before the snapshot the next incremental export starts. updated_at is the writer's
+# transaction start, so a write can commit after the snapshot with an older timestamp.
+EXPORT_WATERMARK_OVERLAP_SECONDS = float(os.getenv('EXPORT_WATERMARK_OVERLAP_SECONDS', '300'))
+EXPORT_COLUMNS = ("id",) + tuple(c for c in PROFILE_COLUMNS if c not in INTERNAL_COLUMNS) + ("created_at", "updated_at")
+
+class ProfileExport:
+    """
+    Iterates over stored profiles in batches of dicts, oldest first, through a named
+    (server-side) cursor. PostgreSQL keeps the result set and sends one batch per round
+    trip, so memory use depends on batch_size and not on the size of the table.
+    With updated_since, only profiles written at or after that time are exported.
+
+    Incremental exports overlap: `watermark` lies EXPORT_WATERMARK_OVERLAP_SECONDS before
+    the snapshot, so the next run repeats recently written profiles rather than missing
+    writes that committed late. Consumers keep the row with the latest updated_at per id.
+    """
+
+    def __init__(self, updated_since=None, batch_size: int = EXPORT_BATCH_SIZE,
+                 overlap_seconds: float = EXPORT_WATERMARK_OVERLAP_SECONDS):
+        self.updated_since = updated_since
+        self.batch_size = max(1, batch_size)
+        self.overlap = datetime.timedelta(seconds=overlap_seconds)
+        # Database time of the export's snapshot, and the updated_since to pass next time.
+        self.snapshot_at = None
+        self.watermark = None
+        self.rows = 0
+
+    def __iter__(self):
+        where = sql.SQL("WHERE updated_at >= %s" if self.updated_since is not None else "")
+        query = sql.SQL("SELECT {columns} FROM prism_table {where} ORDER BY updated_at, id").format(
+            columns=sql.SQL(", ").join(map(sql.Identifier, EXPORT_COLUMNS)), where=where)
+        with get_connection() as conn:
+            if not conn:
+                raise RuntimeError("Could not connect to PostgreSQL to export profiles.")
+            try:
+                with conn.cursor() as cur:
+                    # Under REPEATABLE READ the timestamp query and the named cursor below share
+                    # the snapshot taken by the first statement.
+                    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                    cur.execute("SELECT CURRENT_TIMESTAMP")
+                    self.snapshot_at = cur.fetchone()[0]
+                    self.watermark = self.snapshot_at - self.overlap
+                with conn.cursor(name="prism_export") as cur:
+                    cur.itersize = self.batch_size
+                    cur.execute(query, (self.updated_since,) if self.updated_since is not None else None)
+                    while True:
+                        fetched = cur.fetchmany(self.batch_size)
+                        if not fetched:
+                            break
+                        self.rows += len(fetched)
+                        yield [dict(zip(EXPORT_COLUMNS, row)) for row in fetched]
+            finally:
+                conn.rollback()  # Read-only; also closes the cursor if the caller stopped early
+
+def export_profiles(updated_since=None, batch_size: int = EXPORT_BATCH_SIZE) -> ProfileExport:
+    """Streams every stored profile, or those written since `updated_since`; see ProfileExport."""
+    return ProfileExport(updated_since, batch_size)
+
+# --- Listing ---
+LIST_SORT_COLUMNS = ("id", "email")
+LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', '50'))
+# Listing pages are served from memory for this long unless a write invalidates them first.
+LIST_CACHE_TTL_SECONDS = float(os.getenv('LIST_CACHE_TTL_SECONDS', '30'))
+
+_list_cache = {}
+_list_cache_lock = threading.Lock()
+_list_generation = 0
+
+def invalidate_listing_cache():
+    """Drops every cached listing page and count; called after each successful write."""
+    global _list_generation
+    with _list_cache_lock:
+        _list_generation += 1
+        _list_cache.clear()
+
+def _cached(key, loader):
+    now = time.monotonic()
+    with _list_cache_lock:
+        entry = _list_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+        generation = _list_generation
+    value = loader()
+    with _list_cache_lock:
+        # A write that happened while loading makes this value stale; don't cache it.
+        if generation == _list_generation:
+            _list_cache[key] = (now + LIST_CACHE_TTL_SECONDS, value)
+    return value
+
+def _load_profile_page(page_size: int, sort: str, descending: bool, after) -> dict:
+    sort_col = sql.Identifier(sort)
+    direction = sql.SQL("DESC" if descending else "ASC")
+    conditions = [sql.SQL("email IS NOT NULL")] if sort == "email" else []
+    params = []
+    if after is not None:
+        # Keyset pagination: continue strictly after the last row of the previous page,
+        # so every page costs one index range scan regardless of how deep it is.
+        conditions.append(sql.SQL("({}, id) {} (%s, %s)").format(sort_col, sql.SQL("<" if descending else ">")))
+        params.extend(after)
+    where = sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL("")
+    query = sql.SQL("SELECT id, name, email FROM prism_table {where} ORDER BY {col} {dir}, id {dir} LIMIT %s").format(
+        where=where, col=sort_col, dir=direction)
+
+    with get_connection() as conn:
+        if not conn: return {"rows": [], "next_cursor": None}
+        with conn.cursor() as cur:
+            cur.execute(query, (*params, page_size + 1))
+            fetched = cur.fetchall()
+    rows = [{"id": row[0], "name": row[1], "email": row[2]} for row in fetched[:page_size]]
+    next_cursor = None
+    if len(fetched) > page_size:
+        last = rows[-1]
+        next_cursor = (last[sort], last["id"])
+    return {"rows": rows, "next_cursor": next_cursor}
+
+def list_profiles(page_size: int = LIST_PAGE_SIZE, sort: str = "id", descending: bool = False, after=None) -> dict:
+    """
+    Returns one page of profiles as {"rows": [...], "next_cursor": ...}.
+    Pass the returned next_cursor as `after` to fetch the following page; it is None on the last page.
+    Sorting by email only lists profiles that have an email.
+    """
+    if sort not in LIST_SORT_COLUMNS:
+        raise ValueError(f"Unknown sort column {sort!r}; expected one of {LIST_SORT_COLUMNS}")
+    after = tuple(after) if after is not None else None
+    return _cached(("page", page_size, sort, descending, after),
+                   lambda: _load_profile_page(page_size, sort, descending, after))
+
+def _load_profile_count() -> int:
+    with get_connection() as conn:
+        if not conn: return 0
+        with conn.cursor() as cur:
+            # The planner's row estimate is free to read; fall back to counting if the table was never analyzed.
+            cur.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = 'prism_table'::regclass")
+            estimate = cur.fetchone()[0]
+            if estimate is None or estimate < 0:
+                cur.execute("SELECT COUNT(*) FROM prism_table")
+                estimate = cur.fetchone()[0]
+            return estimate
+
+def approximate_profile_count() -> int:
+    """A fast estimate of the number of stored profiles, suitable for display."""
+    return _cached(("count",), _load_profile_count)
+
+# --- Search ---
+# Must match the expression of the prism_table_search_fts index created in services/migrations.py.
+SEARCH_DOCUMENT = sql.SQL("to_tsvector('english', coalesce(name, '') || ' ' || coalesce(summary, ''))")
+SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '20'))
+
+def _like_pattern(value: str) -> str:
+    """A lower-cased LIKE pattern matching `value` anywhere, with its wildcards taken literally."""
+    escaped = value.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def search_profiles(name: str = None, text: str = None, skills: list = None, company: str = None,
+                    institution: str = None, limit: int = SEARCH_PAGE_SIZE, offset: int = 0) -> dict:
+    """
+    Finds profiles matching every given filter, best matches first.
+      name        - substring/fuzzy match on the name (trigram index)
+      text        - full-text query over name and summary, e.g. 'machine learning -sales'
+      skills      - profiles listing all of these skills in top_area_of_expertise (any case)
+      company     - profiles with a work_experience company containing this text (any case)
+      institution - profiles with an education institution containing this text (any case)
+    Returns {"rows": [...], "has_more": bool}; page through with limit/offset.
+    """
+    conditions, params, rank_terms, rank_params = [], [], [], []
+    if name and name.strip():
+        conditions.append(sql.SQL("(name ILIKE %s OR name %% %s)"))
+        params += [_like_pattern(name), name.strip()]
+        rank_terms.append(sql.SQL("similarity(name, %s)"))
+        rank_params.append(name.strip())
+    if text and text.strip():
+        conditions.append(sql.SQL("{} @@ websearch_to_tsquery('english', %s)").format(SEARCH_DOCUMENT))
+        params.append(text.strip())
+        rank_terms.append(sql.SQL("ts_rank({}, websearch_to_tsquery('english', %s))").format(SEARCH_DOCUMENT))
+        rank_params.append(text.strip())
+    # These expressions must match the indexes of the search_indexes migration.
+    skills = [s.strip().lower() for s in (skills or []) if s and s.strip()]
+    if skills:
+        conditions.append(sql.SQL("prism_search_terms(top_area_of_expertise) @> %s::text[]"))
+        params.append(skills)
+    if company and company.strip():
+        conditions.append(sql.SQL("prism_search_text(work_experience, 'company') LIKE %s"))
+        params.append(_like_pattern(company))
+    if institution and institution.strip():
+        conditions.append(sql.SQL("prism_search_text(education, 'institution') LIKE %s"))
+        params.append(_like_pattern(institution))
+    if not conditions:
+        return {"rows": [], "has_more": False}
+
+    rank = sql.SQL(" + ").join(rank_terms) if rank_terms else sql.SQL("0")
+    query = sql.SQL("""
+        SELECT id, name, email, summary, top_area_of_expertise, {rank} AS rank
+        FROM prism_table
+        WHERE {conditions}
+        ORDER BY rank DESC, id DESC
+        LIMIT %s OFFSET %s
+    """).format(rank=rank, conditions=sql.SQL(" AND ").join(conditions))
+
+    with get_connection() as conn:
+        if not conn: return {"rows": [], "has_more": False}
+        with conn.cursor() as cur:
+            cur.execute(query, (*rank_params, *params, limit + 1, offset))
+            columns = [desc[0] for desc in cur.description]
+            fetched = [dict(zip(columns, row)) for row in cur.fetchall()]
+    return {"rows": fetched[:limit], "has_more": len(fetched) > limit}
@@ -1,50 +1,163 @@
+import os
+import time
+import threading
+import multiprocessing
 from io import BytesIO
-from docx import Document
-import fitz  # PyMuPDF library
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
 
-def get_file_text(uploaded_file):
+# fitz (PyMuPDF) and python-docx are slow to import, so they are imported on first use
+# to keep them off the startup path of the app and the workers.
+
+# --- Configuration ---
+# Optional caps for very long documents; 0 means no limit. Parsing stops early once a cap is hit.
+PARSE_MAX_PAGES = int(os.getenv('PARSE_MAX_PAGES', '0'))
+PARSE_MAX_CHARS = int(os.getenv('PARSE_MAX_CHARS', '0'))
+# PDFs with at least this many pages are split into page ranges and parsed in a process pool.
+PARSE_PARALLEL_MIN_PAGES = int(os.getenv('PARSE_PARALLEL_MIN_PAGES', '16'))
+PARSE_PAGES_PER_CHUNK = int(os.getenv('PARSE_PAGES_PER_CHUNK', '8'))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+HYPERLINK_MARKER = "--- DETECTED HYPERLINKS ---"
+# Separates PDF pages in the extracted text, so page headers and footers can be recognised later.
+PAGE_BREAK = "\f"
+
+
+@dataclass
+class ParsedDocument:
+    """The extracted text of a document plus the numbers needed to monitor parsing."""
+    text: str
+    page_count: int = 0
+    pages_parsed: int = 0
+    truncated: bool = False
+    parse_seconds: float = 0.0
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # "spawn" keeps worker processes safe to start from threaded hosts like Streamlit.
+                _executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                                mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def _extract_pages(pdf_document, start: int, stop: int, max_chars: int = 0) -> tuple:
+    """Reads the text and link URIs of pages [start, stop), stopping once max_chars is reached."""
+    texts, links, chars = [], [], 0
+    for page_num in range(start, stop):
+        page = pdf_document.load_page(page_num)
+        page_text = page.get_text("text")  # Extract plain text
+        texts.append(page_text)
+        chars += len(page_text)
+        # Extract all hyperlink URIs from the page
+        links.extend(link['uri'] for link in page.get_links() if link.get('uri'))
+        if max_chars and chars >= max_chars:
+            break
+    return texts, links
+
+
+def _extract_page_range(pdf_bytes: bytes, start: int, stop: int) -> tuple:
+    """Process-pool entry point: each worker opens its own copy of the document."""
+    import fitz  # PyMuPDF library
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+        return _extract_pages(pdf_document, start, stop)
+
+
+def _parse_pdf(pdf_bytes: bytes, max_pages: int, max_chars: int) -> ParsedDocument:
+    import fitz  # PyMuPDF library
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as pdf_document:
+        page_count = len(pdf_document)
+        limit = min(page_count, max_pages) if max_pages else page_count
+
+        if limit < PARSE_PARALLEL_MIN_PAGES or PARSE_WORKERS < 2:
+            texts, links = _extract_pages(pdf_document, 0, limit, max_chars)
+        else:
+            ranges = [(start, min(start + PARSE_PAGES_PER_CHUNK, limit))
+                      for start in range(0, limit, PARSE_PAGES_PER_CHUNK)]
+            futures = [_get_executor().submit(_extract_page_range, pdf_bytes, start, stop) for start, stop in ranges]
+            texts, links, chars = [], [], 0
+            # Page ranges are collected in order, so the character cap applies exactly as in the serial path.
+            for index, future in enumerate(futures):
+                chunk_texts, chunk_links = future.result()
+                texts.extend(chunk_texts)
+                links.extend(chunk_links)
+                chars += sum(map(len, chunk_texts))
+                if max_chars and chars >= max_chars:
+                    for pending in futures[index + 1:]:
+                        pending.cancel()
+                    break
+
+    text = PAGE_BREAK.join(texts)
+    truncated = len(texts) < page_count or bool(max_chars and len(text) > max_chars)
+    if max_chars:
+        text = text[:max_chars]
+
+    # De-duplicate links and append them to the text
+    if links:
+        lines = [text, f"\n\n{HYPERLINK_MARKER}\n"]
+        lines.extend(f"- {link}\n" for link in sorted(set(links)))
+        text = "".join(lines)
+    return ParsedDocument(text=text, page_count=page_count, pages_parsed=len(texts), truncated=truncated)
+
+
+def _parse_docx(docx_bytes: bytes, max_chars: int) -> ParsedDocument:
+    from docx import Document
+    doc = Document(BytesIO(docx_bytes))
+    parts, chars, truncated = [], 0, False
+    for para in doc.paragraphs:
+        parts.append(para.text + "\n")
+        chars += len(para.text) + 1
+        if max_chars and chars >= max_chars:
+            truncated = chars > max_chars or len(parts) < len(doc.paragraphs)
+            break
+    text = "".join(parts)
+    return ParsedDocument(text=text[:max_chars] if max_chars else text, truncated=truncated)
+
+
+def _parse_txt(txt_bytes: bytes, max_chars: int) -> ParsedDocument:
+    text = txt_bytes.decode('utf-8')
+    truncated = bool(max_chars and len(text) > max_chars)
+    return ParsedDocument(text=text[:max_chars] if max_chars else text, truncated=truncated)
+
+
+def parse_document_bytes(data: bytes, file_name: str, max_pages: int = PARSE_MAX_PAGES,
+                         max_chars: int = PARSE_MAX_CHARS) -> ParsedDocument:
     """
-    Extracts text and embedded hyperlinks from PDF, DOCX, or TXT files.
-    For PDFs, it appends all found URLs to the end of the text to give the LLM full context.
+    Extracts text and embedded hyperlinks from the raw bytes of a PDF, DOCX, or TXT file.
+    For PDFs, all found URLs are appended to the end of the text to give the LLM full context.
     """
-    text = ""
-    file_name = uploaded_file.name
-    
-    if file_name.endswith('.pdf'):
+    started = time.perf_counter()
+    extension = os.path.splitext(file_name)[1].lower()  # RESUME.PDF is a PDF too
+    if extension == '.pdf':
         try:
-            # Read the file into memory
-            pdf_bytes = BytesIO(uploaded_file.read())
-            pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-            
-            all_links = []
-            # Iterate through each page to extract text and links
-            for page_num in range(len(pdf_document)):
-                page = pdf_document.load_page(page_num)
-                text += page.get_text("text")  # Extract plain text
-                
-                # Extract all hyperlink URIs from the page
-                links = page.get_links()
-                for link in links:
-                    if link.get('uri'):
-                        all_links.append(link['uri'])
-            
-            # De-duplicate links and append them to the text
-            if all_links:
-                unique_links = sorted(list(set(all_links)))
-                text += "\n\n--- DETECTED HYPERLINKS ---\n"
-                for link in unique_links:
-                    text += f"- {link}\n"
-                    
+            parsed = _parse_pdf(data, max_pages, max_chars)
         except Exception as e:
             print(f"Error parsing PDF with PyMuPDF: {e}")
-            return "" # Return empty string on failure
-
-    elif file_name.endswith('.docx'):
-        doc = Document(BytesIO(uploaded_file.read()))
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-            
-    elif file_name.endswith('.txt'):
-        text = uploaded_file.read().decode('utf-8')
-        
-    return text
\ No newline at end of file
+            parsed = ParsedDocument(text="") # Empty text on failure
+    elif extension == '.docx':
+        parsed = _parse_docx(data, max_chars)
+    elif extension == '.txt':
+        parsed = _parse_txt(data, max_chars)
+    else:
+        parsed = ParsedDocument(text="")
+    parsed.parse_seconds = time.perf_counter() - started
+    return parsed
+
+
+def parse_file(uploaded_file, max_pages: int = PARSE_MAX_PAGES, max_chars: int = PARSE_MAX_CHARS) -> ParsedDocument:
+    """Parses an uploaded (or opened) file and reports page count and parse time alongside the text."""
+    return parse_document_bytes(uploaded_file.read(), uploaded_file.name, max_pages, max_chars)
+
+
+def get_file_text(uploaded_file):
+    """
+    Extracts text and embedded hyperlinks from PDF, DOCX, or TXT files.
+    For PDFs, it appends all found URLs to the end of the text to give the LLM full context.
+    """
+    return parse_file(uploaded_file).text
@@ -0,0 +1,227 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+from contextlib import contextmanager
+
+# --- Configuration ---
+# A local SQLite file shared by the Streamlit server and any standalone worker processes on the machine.
+JOB_QUEUE_PATH = os.getenv('JOB_QUEUE_PATH', os.path.join('.cache', 'jobs.sqlite3'))
+# Workers refresh heartbeat_at on each running job this often.
+JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', '15'))
+# Running jobs without a heartbeat for this long are assumed orphaned by a crashed worker and re-queued.
+JOB_STALE_AFTER_SECONDS = float(os.getenv('JOB_STALE_AFTER_SECONDS', '120'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+# Finished jobs and their events are deleted after this long.
+JOB_RETENTION_SECONDS = float(os.getenv('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED_STATUSES = {DONE, FAILED}
+
+_initialized_paths = set()
+
+
+@contextmanager
+def _connect(path: str = None):
+    """Opens a short-lived connection; SQLite connections are cheap and this keeps every thread independent."""
+    path = path or JOB_QUEUE_PATH
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        if path not in _initialized_paths:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    file_name TEXT NOT NULL,
+                    payload BLOB,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    heartbeat_at REAL,
+                    finished_at REAL
+                )
+            """)
+            # Queue files created before heartbeats were added.
+            if "heartbeat_at" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+                conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    event TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, id)")
+            _initialized_paths.add(path)
+        yield conn
+    finally:
+        conn.close()
+
+
+def submit_job(file_name: str, data: bytes) -> str:
+    """Queues a document for processing and returns its job id."""
+    job_id = uuid.uuid4().hex
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO jobs (id, status, file_name, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, QUEUED, file_name, data, time.time())
+        )
+    return job_id
+
+
+# A claimed job may only be updated by the attempt that claimed it; a stale worker whose job
+# was re-queued and claimed again must not overwrite the newer attempt's events or result.
+_OWNED_BY = "id = ? AND worker = ? AND attempts = ? AND status = ?"
+
+def _owner(job: dict) -> tuple:
+    return (job["id"], job["worker"], job["attempt"], RUNNING)
+
+
+def claim_job(worker: str):
+    """
+    Atomically takes the oldest queued job and marks it running.
+    Returns {"id", "file_name", "payload", "worker", "attempt"} or None when the queue is empty.
+    The returned job is what heartbeat(), add_event(), complete_job() and fail_job() take.
+    """
+    with _connect() as conn:
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never claim the same job.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, file_name, payload, attempts FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            if row:
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (RUNNING, worker, now, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if not row:
+        return None
+    return {"id": row[0], "file_name": row[1], "payload": row[2], "worker": worker, "attempt": row[3] + 1}
+
+
+def heartbeat(job: dict) -> bool:
+    """Marks a claimed job as still being worked on; False once the attempt has been superseded."""
+    with _connect() as conn:
+        return conn.execute(f"UPDATE jobs SET heartbeat_at = ? WHERE {_OWNED_BY}",
+                            (time.time(), *_owner(job))).rowcount > 0
+
+
+def add_event(job: dict, event: dict) -> bool:
+    """Appends a progress event to a claimed job's event log, unless the attempt has been superseded."""
+    with _connect() as conn:
+        return conn.execute(
+            f"INSERT INTO job_events (job_id, created_at, event) "
+            f"SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM jobs WHERE {_OWNED_BY})",
+            (job["id"], time.time(), json.dumps(event, default=str), *_owner(job))
+        ).rowcount > 0
+
+
+def complete_job(job: dict, result: dict) -> bool:
+    """
+    Stores a claimed job's result and drops its uploaded bytes, which are no longer needed.
+    Returns False, storing nothing, if the attempt has been superseded.
+    """
+    with _connect() as conn:
+        return conn.execute(
+            f"UPDATE jobs SET status = ?, result = ?, payload = NULL, finished_at = ? WHERE {_OWNED_BY}",
+            (DONE, json.dumps(result, default=str), time.time(), *_owner(job))
+        ).rowcount > 0
+
+
+def fail_job(job: dict, error: str) -> bool:
+    with _connect() as conn:
+        return conn.execute(
+            f"UPDATE jobs SET status = ?, error = ?, payload = NULL, finished_at = ? WHERE {_OWNED_BY}",
+            (FAILED, error, time.time(), *_owner(job))
+        ).rowcount > 0
+
+
+def requeue_stale_jobs(stale_after: float = JOB_STALE_AFTER_SECONDS) -> int:
+    """
+    Puts jobs orphaned by a crashed worker (no heartbeat for stale_after seconds) back in the
+    queue, or fails them after too many attempts. A re-queued job starts over, so the events of
+    its previous attempt are deleted.
+    """
+    cutoff = time.time() - stale_after
+    # Jobs claimed before heartbeats were recorded fall back to their start time.
+    stale = "status = ? AND coalesce(heartbeat_at, started_at) < ?"
+    with _connect() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = ?, payload = NULL, error = 'Worker stopped responding too many times.', "
+                f"finished_at = ? WHERE {stale} AND attempts >= ?",
+                (FAILED, time.time(), RUNNING, cutoff, JOB_MAX_ATTEMPTS)
+            )
+            conn.execute(f"DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE {stale})",
+                         (RUNNING, cutoff))
+            requeued = conn.execute(f"UPDATE jobs SET status = ?, worker = NULL WHERE {stale}",
+                                    (QUEUED, RUNNING, cutoff)).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    return requeued
+
+
+def prune_finished_jobs(retention: float = JOB_RETENTION_SECONDS) -> int:
+    """Deletes finished jobs older than the retention period, with their events."""
+    cutoff = time.time() - retention
+    with _connect() as conn:
+        conn.execute(
+            "DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?)",
+            (DONE, FAILED, cutoff)
+        )
+        return conn.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                            (DONE, FAILED, cutoff)).rowcount
+
+
+def get_jobs(job_ids: list) -> dict:
+    """Returns {job_id: job} for the given ids, without the uploaded bytes."""
+    if not job_ids:
+        return {}
+    with _connect() as conn:
+        rows = conn.execute(
+            f"SELECT id, status, file_name, attempts, result, error, created_at, started_at, finished_at "
+            f"FROM jobs WHERE id IN ({', '.join('?' * len(job_ids))})", list(job_ids)
+        ).fetchall()
+    jobs = {}
+    for job_id, status, file_name, attempts, result, error, created_at, started_at, finished_at in rows:
+        jobs[job_id] = {
+            "id": job_id, "status": status, "file_name": file_name, "attempts": attempts, "error": error,
+            "result": json.loads(result) if result else None,
+            "created_at": created_at, "started_at": started_at, "finished_at": finished_at,
+        }
+    return jobs
+
+
+def get_events(job_id: str, after_id: int = 0) -> list:
+    """Returns the events of a job newer than after_id, oldest first, as (event_id, event) pairs."""
+    with _connect() as conn:
+        rows = conn.execute(
+            "SELECT id, event FROM job_events WHERE job_id = ? AND id > ? ORDER BY id", (job_id, after_id)
+        ).fetchall()
+    return [(event_id, json.loads(event)) for event_id, event in rows]
+
+
+def queue_depth() -> dict:
+    """Number of jobs per status."""
+    with _connect() as conn:
+        return dict(conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
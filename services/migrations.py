@@ -0,0 +1,209 @@
+"""
+Versioned schema migrations for the profile database.
+
+Usage:
+    uv run python -m services.migrations           # apply pending migrations
+    uv run python -m services.migrations --status  # list applied and pending migrations
+
+Each migration runs once and is recorded in the schema_migrations table.
+Index migrations use CREATE INDEX CONCURRENTLY so they can run against a live,
+large prism_table without blocking writes; those run outside a transaction.
+"""
+import sys
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+
+from .database import get_connection
+
+# Arbitrary key for pg_advisory_lock, so two processes never migrate at the same time.
+MIGRATION_LOCK_ID = 7_242_031
+
+MIGRATIONS = [
+    {
+        "version": 1,
+        "name": "create_prism_table",
+        "transactional": True,
+        "statements": [
+            """
+            CREATE TABLE IF NOT EXISTS prism_table (
+                id SERIAL PRIMARY KEY,
+                email VARCHAR(50) UNIQUE,
+                name VARCHAR(100),
+                phone_number VARCHAR(50),
+                linkedin_url VARCHAR(100),
+                github_url VARCHAR(100),
+                portfolio_url VARCHAR(100),
+                summary TEXT,
+                top_area_of_expertise JSONB,
+                education JSONB,
+                work_experience JSONB,
+                phd_title TEXT,
+                latest_projects_and_publications JSONB,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+            """,
+        ],
+    },
+    {
+        "version": 2,
+        "name": "enable_pg_trgm",
+        "transactional": True,
+        "statements": ["CREATE EXTENSION IF NOT EXISTS pg_trgm"],
+    },
+    {
+        "version": 3,
+        "name": "search_indexes",
+        "transactional": False,
+        "statements": [
+            # Lower-cased values of a JSONB list (or of one field of its objects), indexed below for
+            # the case-insensitive skill, employer and institution filters of search_profiles().
+            """
+            CREATE OR REPLACE FUNCTION prism_search_terms(items jsonb, field text DEFAULT NULL)
+            RETURNS text[] LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT coalesce(array_agg(value) FILTER (WHERE value IS NOT NULL), '{}')
+                FROM (
+                    SELECT lower(CASE WHEN field IS NULL THEN item #>> '{}' ELSE item ->> field END) AS value
+                    FROM jsonb_array_elements(CASE WHEN jsonb_typeof(items) = 'array' THEN items ELSE '[]' END) AS item
+                ) AS terms
+            $$
+            """,
+            # One value per line, so a substring pattern never spans two entries.
+            """
+            CREATE OR REPLACE FUNCTION prism_search_text(items jsonb, field text)
+            RETURNS text LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT array_to_string(prism_search_terms(items, field), E'\\n')
+            $$
+            """,
+            # Exact, case-insensitive skill lookups.
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_skills_terms "
+            "ON prism_table USING gin (prism_search_terms(top_area_of_expertise))",
+            # Case-insensitive substring matching on employers and institutions ("google" finds "Google LLC").
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_companies_trgm "
+            "ON prism_table USING gin (prism_search_text(work_experience, 'company') gin_trgm_ops)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_institutions_trgm "
+            "ON prism_table USING gin (prism_search_text(education, 'institution') gin_trgm_ops)",
+            # Substring and fuzzy matching on names.
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_name_trgm "
+            "ON prism_table USING gin (name gin_trgm_ops)",
+            # Full-text search over name and summary. Must match SEARCH_DOCUMENT in services/database.py.
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_search_fts "
+            "ON prism_table USING gin (to_tsvector('english', coalesce(name, '') || ' ' || coalesce(summary, '')))",
+        ],
+    },
+    {
+        "version": 4,
+        "name": "minhash_signatures",
+        "transactional": True,
+        # MinHash signature of each row's source text, for near-duplicate detection (services/near_duplicates.py).
+        # Adding a nullable column without a default does not rewrite the table.
+        "statements": ["ALTER TABLE prism_table ADD COLUMN IF NOT EXISTS minhash_signature BIGINT[]"],
+    },
+    {
+        "version": 5,
+        "name": "profile_updated_at",
+        "transactional": True,
+        # Last time the row's profile was written, for incremental exports (export_profiles(updated_since=...)).
+        # A non-volatile default is evaluated once and kept in the catalog instead of rewriting the
+        # table: existing rows read the migration time, so the next incremental export includes them.
+        "statements": ["ALTER TABLE prism_table ADD COLUMN IF NOT EXISTS updated_at "
+                       "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"],
+    },
+    {
+        "version": 6,
+        "name": "updated_at_index",
+        "transactional": False,
+        "statements": ["CREATE INDEX CONCURRENTLY IF NOT EXISTS prism_table_updated_at "
+                       "ON prism_table (updated_at, id)"],
+    },
+]
+
+
+def _ensure_migrations_table(conn):
+    with conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    conn.commit()
+
+
+def applied_versions(conn) -> set:
+    _ensure_migrations_table(conn)
+    with conn.cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations")
+        versions = {row[0] for row in cur.fetchall()}
+    conn.commit()
+    return versions
+
+
+def _apply(conn, migration: dict):
+    if migration["transactional"]:
+        with conn.cursor() as cur:
+            for statement in migration["statements"]:
+                cur.execute(statement)
+            cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (migration["version"], migration["name"]))
+        conn.commit()
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            for statement in migration["statements"]:
+                cur.execute(statement)
+            cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (migration["version"], migration["name"]))
+    finally:
+        conn.autocommit = False
+
+
+def apply_migrations() -> list:
+    """Applies every pending migration in version order and returns the names of those applied."""
+    applied = []
+    with get_connection() as conn:
+        if not conn: return applied
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        conn.commit()
+        try:
+            done = applied_versions(conn)
+            for migration in sorted(MIGRATIONS, key=lambda m: m["version"]):
+                if migration["version"] in done:
+                    continue
+                print(f"Applying migration {migration['version']}: {migration['name']}")
+                _apply(conn, migration)
+                applied.append(migration["name"])
+        finally:
+            conn.rollback()
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--status", action="store_true", help="Only list applied and pending migrations.")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        with get_connection() as conn:
+            if not conn: return 1
+            done = applied_versions(conn)
+        for migration in MIGRATIONS:
+            state = "applied" if migration["version"] in done else "pending"
+            print(f"{migration['version']:>4}  {migration['name']:<30} {state}")
+        return 0
+
+    applied = apply_migrations()
+    print(f"Applied {len(applied)} migration(s)." if applied else "Database schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
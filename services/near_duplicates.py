@@ -0,0 +1,370 @@
+"""
+Near-duplicate resume detection with MinHash signatures and locality-sensitive hashing.
+
+Usage:
+    uv run python -m services.near_duplicates backfill ./resumes   # sign existing rows from their source files
+    uv run python -m services.near_duplicates stats
+
+Every profile row stores a MinHash signature of its parsed text (prism_table.minhash_signature).
+The signatures are loaded into an in-memory LSH index, which finds stored resumes whose
+estimated word-shingle Jaccard similarity with a new document is at least
+NEAR_DUPLICATE_THRESHOLD without any LLM call. Signing a document is one pass over its
+word shingles (a few milliseconds for a typical resume); the index lookup itself takes
+well under a millisecond.
+"""
+import os
+import re
+import sys
+import time
+import bisect
+import struct
+import hashlib
+import argparse
+import datetime
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from . import database
+
+# --- Configuration ---
+NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+# How often the index picks up signatures written by other processes.
+NEAR_DUPLICATE_REFRESH_SECONDS = float(os.getenv('NEAR_DUPLICATE_REFRESH_SECONDS', '10'))
+
+# Overlap re-read on every refresh, so rows whose transaction committed after a newer row was
+# loaded (and therefore carry an older updated_at) are still picked up.
+NEAR_DUPLICATE_REFRESH_OVERLAP_SECONDS = float(os.getenv('NEAR_DUPLICATE_REFRESH_OVERLAP_SECONDS', '60'))
+
+# Changing any of these invalidates stored signatures; rows must then be backfilled again
+# (`backfill --overwrite`). Signatures of another scheme simply never match.
+NUM_PERMUTATIONS = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 similarity share a bucket with high probability
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_WORDS = 3
+_VALUE_BITS = 56
+_VALUE_MASK = (1 << _VALUE_BITS) - 1
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str) -> set:
+    """Hashes of the overlapping SHINGLE_WORDS-word sequences of the lowercased text."""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return {
+        struct.unpack("<Q", hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"),
+                                            digest_size=8).digest())[0]
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash_signature(text: str) -> list:
+    """
+    One-permutation MinHash signature of the text: each shingle hash falls into one of
+    NUM_PERMUTATIONS bins, and each bin keeps its minimum. That is one pass over the
+    shingles instead of one per permutation. Empty bins borrow the value of the next
+    filled bin, tagged with the distance, so two documents agree on a bin with
+    probability close to their Jaccard similarity either way.
+    """
+    bins = [None] * NUM_PERMUTATIONS
+    for value in shingles(text):
+        index, value = value % NUM_PERMUTATIONS, (value // NUM_PERMUTATIONS) & _VALUE_MASK
+        current = bins[index]
+        if current is None or value < current:
+            bins[index] = value
+    signature = list(bins)
+    for index in range(NUM_PERMUTATIONS):
+        if signature[index] is None:
+            for distance in range(1, NUM_PERMUTATIONS):
+                borrowed = bins[(index + distance) % NUM_PERMUTATIONS]
+                if borrowed is not None:
+                    # Fits a signed BIGINT: 7 bits of distance above 56 bits of value.
+                    signature[index] = (distance << _VALUE_BITS) | borrowed
+                    break
+    return signature
+
+
+def _packed(signature: list) -> array:
+    """The low 32 bits of each value: plenty to tell values apart, at half the memory."""
+    halves = array("I", array("Q", signature).tobytes())
+    return halves[0::2] if sys.byteorder == "little" else halves[1::2]
+
+
+def similarity(first, second) -> float:
+    """Estimated Jaccard similarity of the two documents behind two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERMUTATIONS
+
+
+def _band_keys(packed: array) -> list:
+    raw, width = packed.tobytes(), ROWS_PER_BAND * packed.itemsize
+    return [hash(raw[band * width:(band + 1) * width]) for band in range(BANDS)]
+
+
+class _BandTable:
+    """
+    The bucket of one LSH band as two sorted parallel arrays (key, profile id), about 16
+    bytes per row. New entries go to a small dict that is merged into the arrays once it
+    reaches a quarter of their size, so loading N rows costs O(N log N) overall.
+    """
+
+    MIN_MERGE = 10000
+
+    def __init__(self):
+        self._keys = array("q")
+        self._ids = array("q")
+        self._recent = {}
+        self._recent_count = 0
+
+    def extend(self, entries: list):
+        """Adds (key, profile id) pairs."""
+        recent = self._recent
+        for key, profile_id in entries:
+            if key in recent:
+                recent[key].append(profile_id)
+            else:
+                recent[key] = [profile_id]
+        self._recent_count += len(entries)
+        if self._recent_count >= max(self.MIN_MERGE, len(self._keys) // 4):
+            self._merge()
+
+    def _merge(self):
+        merged = list(zip(self._keys, self._ids))
+        merged.extend((key, profile_id) for key, ids in self._recent.items() for profile_id in ids)
+        merged.sort()  # Two sorted runs at most: timsort merges them in linear time
+        self._keys = array("q", [key for key, _ in merged])
+        self._ids = array("q", [profile_id for _, profile_id in merged])
+        self._recent, self._recent_count = {}, 0
+
+    def get(self, key: int) -> list:
+        start = bisect.bisect_left(self._keys, key)
+        end = bisect.bisect_right(self._keys, key, start)
+        return list(self._ids[start:end]) + self._recent.get(key, [])
+
+
+class LSHIndex:
+    """
+    An in-memory banded LSH index over the stored signatures, refreshed incrementally from
+    PostgreSQL in updated_at order, so re-signed and backfilled rows are picked up too.
+    Signatures are kept packed in one array; a row whose signature changed keeps its old
+    bucket entries, which only add a candidate that fails the similarity check.
+
+    Profiles written by this process are added as soon as the write succeeds (add), and
+    profiles queued for a bulk write as soon as they are queued (add_pending), so a revised
+    copy later in the same run is caught without waiting for the next refresh.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                 refresh_seconds: float = NEAR_DUPLICATE_REFRESH_SECONDS,
+                 refresh_overlap_seconds: float = NEAR_DUPLICATE_REFRESH_OVERLAP_SECONDS):
+        self.threshold = threshold
+        self.refresh_seconds = refresh_seconds
+        self.refresh_overlap = datetime.timedelta(seconds=refresh_overlap_seconds)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._signatures = array("I")
+        self._rows = {}  # profile id -> position in _signatures
+        self._bands = [_BandTable() for _ in range(BANDS)]
+        self._watermark = None  # Latest updated_at loaded
+        # Profiles queued for a bulk write are indexed under negative ids until written.
+        self._pending = {}  # pending id -> queued profile
+        self._written = {}  # pending id -> row id, once the bulk write has happened
+        self._next_pending = 0
+        self._refreshed_at = None
+        self._stats = {"queries": 0, "matches": 0, "candidates": 0}
+
+    def _signature(self, profile_id: int) -> array:
+        row = self._rows[profile_id] * NUM_PERMUTATIONS
+        return self._signatures[row:row + NUM_PERMUTATIONS]
+
+    def add(self, profile_id: int, signature: list):
+        self.add_many([(profile_id, signature)])
+
+    def add_many(self, entries: list):
+        """Adds (profile_id, signature) pairs, replacing the signatures of ids already indexed."""
+        with self._lock:
+            band_entries = [[] for _ in range(BANDS)]
+            for profile_id, signature in entries:
+                if len(signature) != NUM_PERMUTATIONS:
+                    continue  # Written with different MinHash settings
+                packed = _packed(signature)
+                row = self._rows.get(profile_id)
+                if row is None:
+                    self._rows[profile_id] = len(self._signatures) // NUM_PERMUTATIONS
+                    self._signatures.extend(packed)
+                elif self._signature(profile_id) == packed:
+                    continue  # Re-read by the refresh overlap
+                else:
+                    self._signatures[row * NUM_PERMUTATIONS:(row + 1) * NUM_PERMUTATIONS] = packed
+                for band, key in enumerate(_band_keys(packed)):
+                    band_entries[band].append((key, profile_id))
+            for band, pairs in zip(self._bands, band_entries):
+                band.extend(pairs)
+
+    def add_pending(self, signature: list, profile: dict) -> int:
+        """Indexes a profile that has been queued but not written yet; returns its temporary id."""
+        with self._lock:
+            self._next_pending -= 1
+            pending_id = self._next_pending
+            self._pending[pending_id] = profile
+        self.add(pending_id, signature)
+        return pending_id
+
+    def resolve_pending(self, pending_id: int, profile_id: int = None):
+        """Records the row id a queued profile was written under, or drops it if it was not written."""
+        with self._lock:
+            self._pending.pop(pending_id, None)
+            if profile_id is not None:
+                self._written[pending_id] = profile_id
+
+    def pending_profile(self, pending_id: int):
+        """The queued profile behind a temporary id returned by query(), or None once it is written."""
+        with self._lock:
+            return self._pending.get(pending_id)
+
+    def _live(self, candidate: int) -> int:
+        """Maps a bucket entry onto the id query() reports, or None for a queued profile never written."""
+        if candidate >= 0 or candidate in self._pending:
+            return candidate
+        return self._written.get(candidate)
+
+    def refresh(self):
+        """Loads signatures of rows written since the last refresh, minus the overlap."""
+        with self._refresh_lock:
+            after = (self._watermark - self.refresh_overlap, 0) if self._watermark else None
+            while True:
+                rows = database.load_minhash_signatures(after=after)
+                self.add_many([(profile_id, signature) for profile_id, signature, _ in rows])
+                if rows:
+                    after = (rows[-1][2], rows[-1][0])
+                    self._watermark = max(self._watermark or after[0], after[0])
+                if len(rows) < database.MINHASH_LOAD_BATCH_SIZE:
+                    break
+            self._refreshed_at = time.monotonic()
+
+    def _stale(self) -> bool:
+        return self._refreshed_at is None or time.monotonic() - self._refreshed_at > self.refresh_seconds
+
+    def query(self, signature: list):
+        """
+        Returns (profile_id, similarity) of the most similar stored resume above the threshold, or None.
+        A negative profile_id is a profile still queued for a bulk write; see pending_profile().
+        """
+        if self._stale():
+            self.refresh()
+        packed = _packed(signature)
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._bands, _band_keys(packed)):
+                candidates.update(band.get(key))
+            scored = [(similarity(packed, self._signature(c)), self._live(c)) for c in candidates]
+            scored = [(score, c) for score, c in scored if c is not None]
+            self._stats["queries"] += 1
+            self._stats["candidates"] += len(candidates)
+        best = max(scored, default=None)
+        if best is None or best[0] < self.threshold:
+            return None
+        with self._lock:
+            self._stats["matches"] += 1
+        return best[1], best[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, size=len(self._rows), pending=len(self._pending),
+                        signature_bytes=self._signatures.itemsize * len(self._signatures))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_near_duplicate_index() -> LSHIndex:
+    """Returns the process-wide index, loading the stored signatures on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = LSHIndex()
+    return _index
+
+def near_duplicate_stats() -> dict:
+    """Counters of the process-wide index, or {} if it has not been used yet."""
+    return _index.stats() if _index is not None else {}
+
+
+def _file_signature(path: str) -> tuple:
+    """Process-pool entry point: returns (path, candidate email, signature) for one source file."""
+    from services.file_parser import parse_document_bytes
+    from graph.contacts import extract_contacts
+
+    with open(path, "rb") as f:
+        text = parse_document_bytes(f.read(), path).text
+    if not text.strip():
+        return path, None, None
+    return path, extract_contacts(text)["email"], minhash_signature(text)
+
+
+def backfill(paths: list, workers: int = None, overwrite: bool = False) -> dict:
+    """
+    Signs existing rows from their source files. Rows are matched on the candidate email found
+    in each file, like the duplicate check in the graph; files without a matching row are skipped.
+    """
+    counts = {"files": len(paths), "signed": 0, "no_email": 0, "skipped": 0}
+    batch = {}  # One statement cannot update a row twice, so the last file per email wins
+
+    def write(batch):
+        signed = database.store_minhash_signatures(list(batch.items()), overwrite=overwrite)
+        counts["signed"] += signed
+        counts["skipped"] += len(batch) - signed  # No row with that email, or already signed
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path, email, signature in executor.map(_file_signature, paths, chunksize=8):
+            if not email or signature is None:
+                counts["no_email"] += 1
+                continue
+            batch[email.lower()] = signature
+            if len(batch) >= database.MINHASH_LOAD_BATCH_SIZE:
+                write(batch)
+                batch = {}
+    if batch:
+        write(batch)
+    return counts
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Manage the near-duplicate resume index.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill_parser = commands.add_parser("backfill", help="Store signatures for existing rows from source files.")
+    backfill_parser.add_argument("directory", nargs="?", help="Directory of the original .pdf, .docx and .txt files.")
+    backfill_parser.add_argument("--manifest", help="Text file listing one file path per line.")
+    backfill_parser.add_argument("--workers", type=int, default=None, help="Parsing processes (default: CPU count).")
+    backfill_parser.add_argument("--overwrite", action="store_true", help="Replace signatures that already exist.")
+    commands.add_parser("stats", help="Load the index and print its size and a sample query time.")
+    args = parser.parse_args(argv)
+
+    if args.command == "backfill":
+        if not args.directory and not args.manifest:
+            parser.error("Provide a directory, a --manifest, or both.")
+        from ingest import discover_files
+        paths = discover_files(args.directory, args.manifest)
+        started = time.perf_counter()
+        counts = backfill(paths, args.workers, args.overwrite)
+        print(f"Backfilled in {time.perf_counter() - started:.1f}s: "
+              + ", ".join(f"{key}={value}" for key, value in counts.items()), file=sys.stderr)
+        return 0
+
+    index = get_near_duplicate_index()
+    started = time.perf_counter()
+    index.refresh()
+    print(f"Loaded {index.stats()['size']} signatures in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    probe = minhash_signature("near duplicate index probe")
+    started = time.perf_counter()
+    index.query(probe)
+    print(f"Query time {(time.perf_counter() - started) * 1e6:.0f} µs", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from services.cache import ExtractionCache, make_cache_key
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class ExtractionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, "cache.sqlite3")
+        self.clock = Clock()
+        patch = mock.patch("services.cache.time.time", self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def _cache(self, **kwargs):
+        cache = ExtractionCache(self.path, **kwargs)
+        self.addCleanup(cache._conn.close)
+        return cache
+
+    def _set(self, cache, key):
+        self.clock.now += 1
+        cache.set("profile", key, {"key": key})
+
+    def _get(self, cache, key):
+        self.clock.now += 1
+        return cache.get("profile", key)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self._cache(max_entries=2, ttl_seconds=0)
+        self._set(cache, "a")
+        self._set(cache, "b")
+        self.assertEqual(self._get(cache, "a"), {"key": "a"})
+        self._set(cache, "c")
+        self.assertIsNone(self._get(cache, "b"))
+        self.assertEqual(self._get(cache, "a"), {"key": "a"})
+        self.assertEqual(self._get(cache, "c"), {"key": "c"})
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["size"], 2)
+
+    def test_entry_expires_after_ttl_even_when_read_recently(self):
+        cache = self._cache(max_entries=10, ttl_seconds=60)
+        self._set(cache, "a")
+        self.clock.now += 30
+        self.assertEqual(self._get(cache, "a"), {"key": "a"})
+        self.clock.now += 30
+        self.assertIsNone(self._get(cache, "a"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["expired"], stats["size"]), (1, 1, 1, 0))
+
+    def test_namespaces_are_separate(self):
+        cache = self._cache()
+        cache.set("resume_check", "k", {"is_resume": True})
+        self.assertIsNone(cache.get("profile", "k"))
+
+    def test_entries_survive_reopening_the_file(self):
+        self._set(self._cache(), "a")
+        self.assertEqual(self._get(self._cache(), "a"), {"key": "a"})
+
+    def test_key_ignores_whitespace_but_not_version(self):
+        self.assertEqual(make_cache_key("Jane  Doe\n\fPython", "v1"), make_cache_key("Jane Doe Python", "v1"))
+        self.assertNotEqual(make_cache_key("Jane Doe", "v1"), make_cache_key("Jane Doe", "v2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+from graph import classifier
+from graph.classifier import score_resume, classify_resume
+
+RESUME = """Jane Candidate
+jane.c@gmail.com | +1 (415) 555-0134 | linkedin.com/in/janec
+
+SUMMARY
+Machine learning engineer.
+
+EXPERIENCE
+Senior Engineer, Acme Corp, Jan 2020 - Present
+Engineer, Globex, 2016 - 2020
+
+EDUCATION
+MSc Computer Science, Stanford University, 2014 - 2016
+
+SKILLS
+Python, SQL
+"""
+INVOICE = """Invoice #4411
+Acme Supplies, 12 Main Street
+Purchase order 7781, payable within 30 days. See the terms and conditions overleaf.
+"""
+# A cover letter: contact details and a date, but no sections.
+UNSURE = """Jane Candidate
+jane.c@gmail.com
+
+I am writing to apply for the engineering role at Globex, where I would like to work from 2025 - 2026.
+"""
+
+
+class ScoreResumeTests(unittest.TestCase):
+
+    def test_resume_scores_above_accept_threshold(self):
+        score, signals = score_resume(RESUME)
+        self.assertGreaterEqual(score, classifier.FASTPATH_ACCEPT)
+        self.assertIn("sections (education, experience, skills, summary)", signals)
+        self.assertIn("email", signals)
+        self.assertIn("LinkedIn/GitHub link", signals)
+
+    def test_non_resume_terms_push_score_below_reject_threshold(self):
+        score, signals = score_resume(INVOICE)
+        self.assertLessEqual(score, classifier.FASTPATH_REJECT)
+        self.assertEqual(signals[-1], "non-resume terms (invoice, purchase order, terms and conditions)")
+
+    def test_score_is_clamped(self):
+        self.assertEqual(score_resume(INVOICE * 3)[0], 0.0)
+        self.assertLessEqual(score_resume(RESUME * 3)[0], 1.0)
+
+    def test_only_the_prefix_is_scored(self):
+        padded = "x" * classifier.SCORED_PREFIX_CHARS + RESUME
+        self.assertEqual(score_resume(padded), (0.0, []))
+
+
+class ClassifyResumeTests(unittest.TestCase):
+
+    def test_confident_scores_decide_and_the_middle_band_defers(self):
+        self.assertTrue(classify_resume(RESUME).is_resume)
+        self.assertFalse(classify_resume(INVOICE).is_resume)
+        score = score_resume(UNSURE)[0]
+        self.assertTrue(classifier.FASTPATH_REJECT < score < classifier.FASTPATH_ACCEPT, score)
+        self.assertIsNone(classify_resume(UNSURE))
+
+    def test_thresholds_are_inclusive(self):
+        score = score_resume(UNSURE)[0]
+        with mock.patch.object(classifier, "FASTPATH_ACCEPT", score):
+            self.assertTrue(classify_resume(UNSURE).is_resume)
+        with mock.patch.object(classifier, "FASTPATH_REJECT", score):
+            self.assertFalse(classify_resume(UNSURE).is_resume)
+
+    def test_disabled_fast_path_always_defers(self):
+        with mock.patch.object(classifier, "FASTPATH_ENABLED", False):
+            self.assertIsNone(classify_resume(RESUME))
+
+    def test_outcomes_are_counted(self):
+        before = classifier.classifier_stats()
+        classify_resume(RESUME)
+        classify_resume(UNSURE)
+        after = classifier.classifier_stats()
+        self.assertEqual(after["fast_accept"] - before["fast_accept"], 1)
+        self.assertEqual(after["llm_fallback"] - before["llm_fallback"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from graph.compaction import compact_text, split_into_chunks, merge_profiles
+from services.file_parser import HYPERLINK_MARKER, PAGE_BREAK
+
+JOBS = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+Software Engineer
+Acme Corp
+San Francisco, CA
+2020 - 2023
+Software Engineer
+Globex
+San Francisco, CA
+2018 - 2020
+Software Engineer
+Initech
+San Francisco, CA
+2016 - 2018
+"""
+
+
+def pages(*texts):
+    return PAGE_BREAK.join(texts)
+
+
+class CompactTextTests(unittest.TestCase):
+
+    def test_repeated_content_lines_are_kept(self):
+        compacted = compact_text(JOBS)
+        self.assertEqual(compacted.count("Software Engineer"), 3)
+        self.assertEqual(compacted.count("San Francisco, CA"), 3)
+
+    def test_year_on_its_own_line_is_kept(self):
+        text = "EDUCATION\nPhD Computer Science\nMIT\n2014\n"
+        self.assertIn("2014", compact_text(text).splitlines())
+
+    def test_year_at_a_page_edge_is_kept(self):
+        text = pages("Jane Doe\nEDUCATION\nPhD Computer Science\n2014\n", "EXPERIENCE\nEngineer\n")
+        self.assertIn("2014", compact_text(text).splitlines())
+
+    def test_explicit_page_numbers_are_dropped(self):
+        for footer in ("Page 2", "page 2 of 3", "2 of 3", "- 2 -"):
+            with self.subTest(footer=footer):
+                self.assertNotIn(footer, compact_text(f"Jane Doe\nSkills\n{footer}\nPython\n"))
+
+    def test_bare_page_numbers_at_page_edges_are_dropped(self):
+        text = pages("Jane Doe\nSummary\n1\n", "Experience\nEngineer\n2\n", "Education\nMIT\n3\n")
+        lines = compact_text(text).splitlines()
+        for number in ("1", "2", "3"):
+            self.assertNotIn(number, lines)
+
+    def test_page_headers_and_footers_are_kept_once(self):
+        text = pages(
+            "Jane Doe - Resume\nSummary\nBuilds things.\nConfidential\n",
+            "Jane Doe - Resume\nExperience\nEngineer at Acme\nConfidential\n",
+            "Jane Doe - Resume\nEducation\nMIT\nConfidential\n",
+        )
+        compacted = compact_text(text)
+        self.assertEqual(compacted.count("Jane Doe - Resume"), 1)
+        self.assertEqual(compacted.count("Confidential"), 1)
+        self.assertIn("Engineer at Acme", compacted)
+
+    def test_headers_with_page_numbers_are_recognised(self):
+        text = pages("Jane Doe Page 1\nSummary\n", "Jane Doe Page 2\nExperience\n")
+        self.assertNotIn("Jane Doe Page 2", compact_text(text))
+
+    def test_line_ending_one_page_and_starting_the_next_is_kept(self):
+        text = pages("Summary\nBuilds things.\nSoftware Engineer\n", "Software Engineer\nAcme Corp\n")
+        self.assertEqual(compact_text(text).count("Software Engineer"), 2)
+
+    def test_whitespace_is_normalized_and_blank_runs_collapsed(self):
+        self.assertEqual(compact_text("Jane   Doe\n\n\n\nSkills\t Python \n"), "Jane Doe\n\nSkills Python")
+
+    def test_hyperlink_appendix_is_untouched(self):
+        text = f"Jane Doe\n\n{HYPERLINK_MARKER}\n- https://example.com/1\n- https://example.com/1\n"
+        self.assertTrue(compact_text(text).endswith(f"{HYPERLINK_MARKER}\n- https://example.com/1\n"
+                                                    "- https://example.com/1\n"))
+
+
+class SplitAndMergeTests(unittest.TestCase):
+
+    def test_short_text_is_one_chunk(self):
+        self.assertEqual(split_into_chunks("Jane Doe\n\nSkills\nPython", budget=1000), ["Jane Doe\n\nSkills\nPython"])
+
+    def test_sections_are_packed_within_budget(self):
+        text = "Jane Doe\n\nExperience\n" + "Engineer at Acme\n" * 50 + "\nEducation\n" + "MIT\n" * 50
+        chunks = split_into_chunks(text, budget=200)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(chunks[0].startswith("Jane Doe"))
+
+    def test_merge_keeps_first_scalars_and_dedupes_lists(self):
+        merged = merge_profiles([
+            {"name": "Jane Doe", "email": None, "work_experience": [{"company": "Acme"}]},
+            {"name": "Other", "email": "jane@example.com", "work_experience": [{"company": "acme"}, {"company": "Globex"}]},
+        ])
+        self.assertEqual(merged["name"], "Jane Doe")
+        self.assertEqual(merged["email"], "jane@example.com")
+        self.assertEqual(merged["work_experience"], [{"company": "Acme"}, {"company": "Globex"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from graph.contacts import extract_contacts, apply_contact_ground_truth
+from services.file_parser import HYPERLINK_MARKER
+
+RESUME = """Jane Candidate
+Boston, MA | +1 (617) 555-0134 | jane.c@gmail.com
+https://linkedin.com/in/janec
+
+EDUCATION
+PhD Computer Science, MIT
+2019 - 2022
+2016
+
+REFERENCES
+Prof. John Smith, john.smith@mit.edu, +1 617 555 9999
+"""
+
+
+class ExtractContactsTests(unittest.TestCase):
+
+    def test_header_contacts_are_used(self):
+        contacts = extract_contacts(RESUME)
+        self.assertEqual(contacts["email"], "jane.c@gmail.com")
+        self.assertEqual(contacts["phone_number"], "+1 (617) 555-0134")
+        self.assertEqual(contacts["linkedin_url"], "https://linkedin.com/in/janec")
+
+    def test_referee_contacts_are_ignored(self):
+        text = RESUME.replace(" | jane.c@gmail.com", "").replace(" | +1 (617) 555-0134", "")
+        contacts = extract_contacts(text)
+        self.assertIsNone(contacts["email"])
+        self.assertIsNone(contacts["phone_number"])
+
+    def test_single_mailto_link_is_used_without_header_email(self):
+        text = RESUME.replace(" | jane.c@gmail.com", "") + f"\n{HYPERLINK_MARKER}\n- mailto:jane.c@gmail.com\n"
+        self.assertEqual(extract_contacts(text)["email"], "jane.c@gmail.com")
+
+    def test_ambiguous_mailto_links_are_not_used(self):
+        text = (RESUME.replace(" | jane.c@gmail.com", "")
+                + f"\n{HYPERLINK_MARKER}\n- mailto:jane.c@gmail.com\n- mailto:john.smith@mit.edu\n")
+        self.assertIsNone(extract_contacts(text)["email"])
+
+    def test_date_lines_are_not_phone_numbers(self):
+        for text in ("Jane\n2019 - 2022\n2016\n", "Jane\n2016 2019 2022\n", "Jane\n2012 – 2016 2019\n"):
+            with self.subTest(text=text):
+                self.assertIsNone(extract_contacts(text)["phone_number"])
+
+
+class GroundTruthTests(unittest.TestCase):
+
+    def test_rule_values_override_and_portfolio_only_fills(self):
+        profile = {"email": "wrong@example.com", "phone_number": None, "portfolio_url": "https://jane.dev"}
+        contacts = {"email": "jane.c@gmail.com", "phone_number": "+1 (617) 555-0134",
+                    "linkedin_url": None, "github_url": None, "portfolio_url": "https://other.dev"}
+        profile = apply_contact_ground_truth(profile, contacts)
+        self.assertEqual(profile["email"], "jane.c@gmail.com")
+        self.assertEqual(profile["phone_number"], "+1 (617) 555-0134")
+        self.assertEqual(profile["portfolio_url"], "https://jane.dev")
+
+    def test_missing_rule_values_keep_llm_values(self):
+        profile = apply_contact_ground_truth({"email": "jane@example.com"}, {"email": None})
+        self.assertEqual(profile["email"], "jane@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
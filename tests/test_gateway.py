@@ -0,0 +1,145 @@
+import unittest
+from unittest import mock
+from graph import gateway
+from graph.gateway import LLMGateway, RoutedChain, TokenBucket
+from graph.instrumentation import REGISTRY
+
+
+class RateLimitError(Exception):
+    """Named like groq.RateLimitError, which the gateway recognises by name."""
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.response = mock.Mock(headers={"retry-after": retry_after} if retry_after else {})
+
+
+class BadRequestError(Exception):
+    """Named like groq.BadRequestError; Groq reports a tool call that fails the schema this way."""
+
+    def __init__(self):
+        super().__init__("Error code: 400 - tool_use_failed")
+
+
+class FakeChain:
+    """Returns or raises the given outcomes in order, recording each prompt."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def _counter(name, **labels):
+    return REGISTRY.snapshot()["counters"].get((name, tuple(sorted(labels.items()))), 0)
+
+
+class GatewayRetryTests(unittest.TestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(gateway, "_retryable_errors", return_value=(ConnectionError, RateLimitError)),
+            mock.patch("graph.gateway.time.sleep"),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.sleep = gateway.time.sleep
+        self.gateway = LLMGateway(rate_limits={"m": (1000, 10 ** 6)}, max_retries=2, retry_base_seconds=0.01)
+
+    def test_transient_errors_are_retried_on_the_same_model(self):
+        chain = FakeChain(ConnectionError(), ConnectionError(), "ok")
+        before = _counter("llm_gateway_retries_total", model="m", reason="ConnectionError")
+        self.assertEqual(self.gateway.call("test", "m", chain.invoke, "prompt", 10), "ok")
+        self.assertEqual(chain.prompts, ["prompt"] * 3)
+        self.assertEqual(self.sleep.call_count, 2)
+        self.assertEqual(_counter("llm_gateway_retries_total", model="m", reason="ConnectionError") - before, 2)
+
+    def test_gives_up_after_max_retries(self):
+        chain = FakeChain(*[ConnectionError()] * 3)
+        with self.assertRaises(ConnectionError):
+            self.gateway.call("test", "m", chain.invoke, "prompt", 10)
+        self.assertEqual(len(chain.prompts), 3)
+
+    def test_other_errors_are_not_retried(self):
+        chain = FakeChain(BadRequestError())
+        with self.assertRaises(BadRequestError):
+            self.gateway.call("test", "m", chain.invoke, "prompt", 10)
+        self.assertEqual(len(chain.prompts), 1)
+
+    def test_429_pauses_every_caller_of_the_model_for_retry_after(self):
+        chain = FakeChain(RateLimitError(retry_after="7"), "ok")
+        self.assertEqual(self.gateway.call("test", "m", chain.invoke, "prompt", 10), "ok")
+        backoff, throttled = self.sleep.call_args_list
+        self.assertEqual(backoff, mock.call(7.0))
+        # The retry itself waited for the pause, as does the next caller.
+        self.assertGreater(throttled.args[0], 6)
+        self.assertGreater(self.gateway.limiters["m"].reserve(10), 6)
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def test_debt_is_repaid_at_the_refill_rate(self):
+        bucket = TokenBucket(per_minute=60)
+        now = bucket.updated
+        self.assertEqual(bucket.reserve(60, now), 0.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 1.0)
+        self.assertAlmostEqual(bucket.reserve(1, now), 2.0)
+        self.assertAlmostEqual(bucket.reserve(1, now + 10), 0.0)
+
+    def test_call_larger_than_the_quota_waits_at_most_a_minute(self):
+        bucket = TokenBucket(per_minute=600)
+        now = bucket.updated
+        bucket.reserve(600, now)
+        self.assertAlmostEqual(bucket.reserve(10 ** 6, now), 60.0)
+
+
+class RoutedChainTests(unittest.TestCase):
+
+    def setUp(self):
+        self.gateway = LLMGateway(rate_limits={})
+
+    def _routed(self, *chains):
+        return RoutedChain(self.gateway, "test", [(f"model-{i}", chain) for i, chain in enumerate(chains)], 10)
+
+    def test_invalid_output_escalates_to_the_next_model(self):
+        first, second = FakeChain(BadRequestError()), FakeChain("profile")
+        before = _counter("llm_gateway_escalations_total", task="test", model="model-0")
+        self.assertEqual(self._routed(first, second).invoke("prompt"), "profile")
+        self.assertEqual(second.prompts, ["prompt"])
+        self.assertEqual(_counter("llm_gateway_escalations_total", task="test", model="model-0") - before, 1)
+
+    def test_missing_output_escalates_and_fails_on_the_last_model(self):
+        first, second = FakeChain(None), FakeChain(None)
+        with self.assertRaises(ValueError):
+            self._routed(first, second).invoke("prompt")
+        self.assertEqual((first.prompts, second.prompts), (["prompt"], ["prompt"]))
+
+    def test_other_errors_do_not_escalate(self):
+        first, second = FakeChain(RuntimeError("boom")), FakeChain("profile")
+        with self.assertRaises(RuntimeError):
+            self._routed(first, second).invoke("prompt")
+        self.assertEqual(second.prompts, [])
+
+    def test_invalid_output_from_the_last_model_is_raised(self):
+        with self.assertRaises(BadRequestError):
+            self._routed(FakeChain(BadRequestError())).invoke("prompt")
+
+    def test_escalate_skips_the_streamed_model(self):
+        first, second = FakeChain(), FakeChain("profile")
+        self.assertEqual(self._routed(first, second).escalate("prompt"), "profile")
+        self.assertEqual(first.prompts, [])
+
+    def test_escalate_retries_the_only_model(self):
+        only = FakeChain("profile")
+        self.assertEqual(self._routed(only).escalate("prompt"), "profile")
+        self.assertEqual(only.prompts, ["prompt"])
+
+
+if __name__ == "__main__":
+    unittest.main()
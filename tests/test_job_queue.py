@@ -0,0 +1,102 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+from services import job_queue
+
+
+class JobQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, "jobs.sqlite3")
+        self.now = 1000.0
+        for patch in (mock.patch.object(job_queue, "JOB_QUEUE_PATH", self.path),
+                      mock.patch("services.job_queue.time.time", lambda: self.now)):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _status(self, job_id):
+        return job_queue.get_jobs([job_id])[job_id]
+
+    def test_jobs_are_claimed_oldest_first_and_only_once(self):
+        first = job_queue.submit_job("a.pdf", b"a")
+        self.now += 1
+        second = job_queue.submit_job("b.pdf", b"b")
+        claimed = job_queue.claim_job("w1")
+        self.assertEqual((claimed["id"], claimed["payload"], claimed["attempt"]), (first, b"a", 1))
+        self.assertEqual(job_queue.claim_job("w2")["id"], second)
+        self.assertIsNone(job_queue.claim_job("w3"))
+        self.assertEqual(job_queue.queue_depth(), {job_queue.RUNNING: 2})
+
+    def test_complete_stores_result_and_drops_payload(self):
+        job_id = job_queue.submit_job("a.pdf", b"a")
+        job = job_queue.claim_job("w1")
+        self.assertTrue(job_queue.add_event(job, {"type": "status", "message": "parsing"}))
+        self.assertTrue(job_queue.complete_job(job, {"message": "ok"}))
+        status = self._status(job_id)
+        self.assertEqual((status["status"], status["result"]), (job_queue.DONE, {"message": "ok"}))
+        self.assertEqual(job_queue.get_events(job_id)[0][1], {"type": "status", "message": "parsing"})
+        with sqlite3.connect(self.path) as conn:
+            self.assertIsNone(conn.execute("SELECT payload FROM jobs").fetchone()[0])
+
+    def test_job_without_heartbeat_is_requeued_and_its_events_dropped(self):
+        job_id = job_queue.submit_job("a.pdf", b"a")
+        job = job_queue.claim_job("w1")
+        job_queue.add_event(job, {"type": "status"})
+        self.now += job_queue.JOB_STALE_AFTER_SECONDS - 1
+        self.assertEqual(job_queue.requeue_stale_jobs(), 0)
+        self.now += 2
+        self.assertEqual(job_queue.requeue_stale_jobs(), 1)
+        self.assertEqual(self._status(job_id)["status"], job_queue.QUEUED)
+        self.assertEqual(job_queue.get_events(job_id), [])
+
+        retry = job_queue.claim_job("w2")
+        self.assertEqual((retry["id"], retry["payload"], retry["attempt"]), (job_id, b"a", 2))
+
+    def test_heartbeat_keeps_a_long_job_claimed(self):
+        job_queue.submit_job("a.pdf", b"a")
+        job = job_queue.claim_job("w1")
+        for _ in range(3):
+            self.now += job_queue.JOB_STALE_AFTER_SECONDS - 1
+            self.assertTrue(job_queue.heartbeat(job))
+            self.assertEqual(job_queue.requeue_stale_jobs(), 0)
+
+    def test_superseded_attempt_cannot_overwrite_the_retry(self):
+        job_id = job_queue.submit_job("a.pdf", b"a")
+        stale = job_queue.claim_job("w1")
+        self.now += job_queue.JOB_STALE_AFTER_SECONDS + 1
+        job_queue.requeue_stale_jobs()
+        retry = job_queue.claim_job("w1")
+
+        self.assertFalse(job_queue.heartbeat(stale))
+        self.assertFalse(job_queue.add_event(stale, {"type": "status"}))
+        self.assertFalse(job_queue.complete_job(stale, {"message": "stale"}))
+        self.assertFalse(job_queue.fail_job(stale, "stale"))
+        self.assertTrue(job_queue.complete_job(retry, {"message": "retry"}))
+        self.assertEqual(self._status(job_id)["result"], {"message": "retry"})
+        self.assertEqual(job_queue.get_events(job_id), [])
+
+    def test_job_fails_after_max_attempts(self):
+        job_id = job_queue.submit_job("a.pdf", b"a")
+        for _ in range(job_queue.JOB_MAX_ATTEMPTS):
+            job_queue.claim_job("w1")
+            self.now += job_queue.JOB_STALE_AFTER_SECONDS + 1
+            job_queue.requeue_stale_jobs()
+        status = self._status(job_id)
+        self.assertEqual((status["status"], status["attempts"]), (job_queue.FAILED, job_queue.JOB_MAX_ATTEMPTS))
+        self.assertIsNone(job_queue.claim_job("w1"))
+
+    def test_finished_jobs_are_pruned_after_retention(self):
+        job_id = job_queue.submit_job("a.pdf", b"a")
+        job_queue.fail_job(job_queue.claim_job("w1"), "boom")
+        self.now += job_queue.JOB_RETENTION_SECONDS + 1
+        self.assertEqual(job_queue.prune_finished_jobs(), 1)
+        self.assertEqual(job_queue.get_jobs([job_id]), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import random
+import unittest
+from unittest import mock
+from graph import nodes
+from services.near_duplicates import LSHIndex, minhash_signature, shingles, similarity
+
+RESUME = """Jane Candidate
+jane.c@gmail.com
+
+SUMMARY
+Machine learning engineer with eight years of experience building recommendation systems,
+search ranking and large scale data pipelines for consumer products.
+
+EXPERIENCE
+Senior Machine Learning Engineer, Acme Corp, 2020 - 2024
+Led the ranking team, shipped a two tower retrieval model and cut serving latency by half.
+Machine Learning Engineer, Globex, 2016 - 2020
+Built feature stores, training pipelines and online experiments for the feed.
+
+EDUCATION
+MSc Computer Science, Stanford University, 2016
+"""
+REVISION = RESUME.replace("2020 - 2024", "2020 - 2025").replace("by half", "by sixty percent")
+OTHER = """John Other
+john@example.com
+
+EXPERIENCE
+Pastry chef at a small bakery in Lyon, responsible for laminated doughs and seasonal menus.
+"""
+
+
+def _index():
+    index = LSHIndex(refresh_seconds=float("inf"))
+    with mock.patch("services.database.load_minhash_signatures", return_value=[]):
+        index.refresh()
+    return index
+
+
+def _words(rng, count=300):
+    return [f"w{rng.randrange(5000)}" for _ in range(count)]
+
+
+def _edit(rng, words, rate):
+    """Replaces about `rate` of the words, as a revision of the same resume would."""
+    return [f"w{rng.randrange(5000)}" if rng.random() < rate else word for word in words]
+
+
+def _jaccard(first, second):
+    first, second = shingles(first), shingles(second)
+    return len(first & second) / len(first | second)
+
+
+class MinHashTests(unittest.TestCase):
+
+    def test_signature_estimates_shingle_jaccard(self):
+        rng = random.Random(0)
+        errors = []
+        for rate in (0.01, 0.05, 0.1, 0.3):
+            for _ in range(20):
+                words = _words(rng)
+                first, second = " ".join(words), " ".join(_edit(rng, words, rate))
+                estimate = similarity(minhash_signature(first), minhash_signature(second))
+                errors.append(abs(estimate - _jaccard(first, second)))
+        self.assertLess(sum(errors) / len(errors), 0.05)
+        self.assertLess(max(errors), 0.15)
+
+    def test_signature_ignores_case_and_punctuation(self):
+        self.assertEqual(minhash_signature("Jane Doe, Python; SQL."), minhash_signature("jane doe python sql"))
+
+    def test_short_text_still_has_a_full_signature(self):
+        self.assertEqual(len(minhash_signature("Jane")), len(minhash_signature(RESUME)))
+
+
+class LSHRecallTests(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.documents = [_words(self.rng) for _ in range(200)]
+        self.index = _index()
+        self.index.add_many([(profile_id, minhash_signature(" ".join(words)))
+                             for profile_id, words in enumerate(self.documents)])
+
+    def _found(self, rate):
+        return sum((self.index.query(minhash_signature(" ".join(_edit(self.rng, words, rate)))) or (None,))[0]
+                   == profile_id for profile_id, words in enumerate(self.documents))
+
+    def test_light_revisions_are_found(self):
+        # Replacing 1% of the words keeps about 94% of the shingles.
+        self.assertGreaterEqual(self._found(0.01), 0.95 * len(self.documents))
+
+    def test_heavy_rewrites_and_unrelated_documents_are_not_matched(self):
+        self.assertEqual(self._found(0.3), 0)
+        unrelated = [self.index.query(minhash_signature(" ".join(_words(self.rng)))) for _ in range(100)]
+        self.assertEqual(unrelated, [None] * 100)
+
+    def test_revision_is_found_after_the_band_tables_merge(self):
+        with mock.patch("services.near_duplicates._BandTable.MIN_MERGE", 1):
+            index = _index()
+            for profile_id, words in enumerate(self.documents[:50]):
+                index.add(profile_id, minhash_signature(" ".join(words)))
+        revision = minhash_signature(" ".join(_edit(self.rng, self.documents[10], 0.01)))
+        self.assertEqual(index.query(revision)[0], 10)
+
+
+class _QueueingWriter:
+    """Stands in for ProfileBulkWriter: keeps the queued profiles until flush()."""
+    policy = "skip"
+
+    def __init__(self):
+        self.queued = []
+
+    def add(self, profile_data, key=None, signature=None, on_written=None):
+        self.queued.append((profile_data, on_written))
+
+    def flush(self, first_id=100):
+        for profile_id, (_, on_written) in enumerate(self.queued, start=first_id):
+            if on_written:
+                on_written(profile_id)
+        self.queued = []
+
+
+class SameRunNearDuplicateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = _index()
+        patches = [
+            mock.patch.object(nodes, "report_status"),
+            mock.patch.object(nodes, "NEAR_DUPLICATE_ENABLED", True),
+            mock.patch.object(nodes, "get_near_duplicate_index", return_value=self.index),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def _run(self, text, config, email):
+        state = nodes.check_near_duplicate({"file_content": text, "source": email}, config)
+        if not state["profile_exists_in_db"]:
+            state["profile_data"] = {"email": email, "name": email}
+            state = nodes.add_to_database(state, config)
+        return state
+
+    def test_revision_written_earlier_in_the_run_is_found(self):
+        config = {"configurable": {"conflict_policy": "skip"}}
+        stored = {"id": 7, "email": "jane.c@gmail.com"}
+        with mock.patch.object(nodes, "upsert_profile", return_value=("inserted", 7)), \
+                mock.patch.object(nodes, "get_profile_by_id", return_value=stored):
+            first = self._run(RESUME, config, "jane.c@gmail.com")
+            second = self._run(REVISION, config, "jane.work@gmail.com")
+        self.assertFalse(first["profile_exists_in_db"])
+        self.assertTrue(second["profile_exists_in_db"])
+        self.assertEqual(second["near_duplicate"]["profile_id"], 7)
+        self.assertEqual(second["existing_profile_data"], stored)
+
+    def test_revision_queued_earlier_in_the_run_is_found_before_the_flush(self):
+        writer = _QueueingWriter()
+        config = {"configurable": {"profile_writer": writer}}
+        first = self._run(RESUME, config, "jane.c@gmail.com")
+        second = self._run(REVISION, config, "jane.work@gmail.com")
+        self.assertEqual(first["write_status"], "queued")
+        self.assertTrue(second["profile_exists_in_db"])
+        self.assertIsNone(second["near_duplicate"]["profile_id"])
+        self.assertEqual(second["existing_profile_data"]["email"], "jane.c@gmail.com")
+
+        writer.flush(first_id=100)
+        self.assertEqual(self.index.query(minhash_signature(REVISION))[0], 100)
+
+    def test_unrelated_document_is_not_a_duplicate(self):
+        writer = _QueueingWriter()
+        config = {"configurable": {"profile_writer": writer}}
+        self._run(RESUME, config, "jane.c@gmail.com")
+        self.assertFalse(self._run(OTHER, config, "john@example.com")["profile_exists_in_db"])
+
+    def test_queued_profile_that_was_not_written_stops_matching(self):
+        pending_id = self.index.add_pending(minhash_signature(RESUME), {"email": "jane.c@gmail.com"})
+        self.index.resolve_pending(pending_id, None)
+        self.assertIsNone(self.index.query(minhash_signature(REVISION)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import unittest
+from graph.streaming import ProfileStreamParser
+
+ARGS = {
+    "name": "Jane Doe",
+    "top_skills": ["Python", "SQL"],
+    "work_experience": [
+        {"company": "Acme Corp", "title": "Engineer", "duration": "2020 - 2023"},
+        {"company": "Globex", "title": "Intern", "duration": "2019"},
+    ],
+    "summary": "Builds things, fast.",
+}
+TEXT = json.dumps(ARGS)
+
+EXPECTED = [
+    {"type": "profile_field", "field": "name", "value": "Jane Doe"},
+    {"type": "profile_item", "field": "top_skills", "index": 0, "value": "Python"},
+    {"type": "profile_item", "field": "top_skills", "index": 1, "value": "SQL"},
+    {"type": "profile_item", "field": "work_experience", "index": 0, "value": ARGS["work_experience"][0]},
+    {"type": "profile_item", "field": "work_experience", "index": 1, "value": ARGS["work_experience"][1]},
+    {"type": "profile_field", "field": "summary", "value": "Builds things, fast."},
+]
+
+
+def feed_in_pieces(parser, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events += parser.feed(text[start:start + size])
+    return events
+
+
+class ProfileStreamParserTests(unittest.TestCase):
+
+    def test_small_pieces_report_each_field_and_entry_once(self):
+        for size in (1, 3, 7):
+            with self.subTest(size=size):
+                parser = ProfileStreamParser()
+                events = feed_in_pieces(parser, TEXT, size) + parser.finish()
+                self.assertEqual(events, EXPECTED)
+                self.assertEqual(parser.result(), ARGS)
+
+    def test_one_chunk_reports_everything(self):
+        parser = ProfileStreamParser()
+        self.assertEqual(parser.feed(TEXT) + parser.finish(), EXPECTED)
+
+    def test_string_being_streamed_is_not_reported(self):
+        parser = ProfileStreamParser()
+        self.assertEqual(feed_in_pieces(parser, '{"name": "Jane', 2), [])
+        self.assertEqual(parser.feed(' Doe", "top_skills": ['), [EXPECTED[0]])
+
+    def test_list_entry_being_streamed_is_not_reported(self):
+        parser = ProfileStreamParser()
+        events = parser.feed('{"top_skills": ["Python", "SQ')
+        self.assertEqual(events, [EXPECTED[1]])
+        self.assertEqual(parser.feed('L"], "name": "Jane Doe"'), [EXPECTED[2]])
+
+    def test_nested_object_being_streamed_is_not_reported(self):
+        parser = ProfileStreamParser()
+        cut = TEXT.index('"Globex"') + 3
+        events = feed_in_pieces(parser, TEXT[:cut], 4)
+        self.assertEqual(events[-1], EXPECTED[3])
+        self.assertNotIn("Globex", json.dumps(events))
+        self.assertEqual(feed_in_pieces(parser, TEXT[cut:], 4) + parser.finish(), EXPECTED[4:])
+
+    def test_missing_tool_call_is_an_error(self):
+        with self.assertRaises(ValueError):
+            ProfileStreamParser().result()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,36 @@
-
 import streamlit as st
-from services.database import get_all_professors
+from services.database import list_profiles, approximate_profile_count
 
 def render_list_all():
-    """Renders the component that lists all professor profiles."""
+    """Renders the component that lists professor profiles one page at a time."""
     st.header("All Professor Profiles")
-    
-    professors = get_all_professors()
-    
-    if professors:
-        st.success(f"Retrieved {len(professors)} profiles from the database.")
-        st.table(professors)
+
+    col_sort, col_order, col_size = st.columns(3)
+    sort = col_sort.selectbox("Sort by", ["id", "email"], format_func=lambda c: "Date added" if c == "id" else "Email")
+    descending = col_order.selectbox("Order", ["Ascending", "Descending"]) == "Descending"
+    page_size = col_size.selectbox("Profiles per page", [25, 50, 100], index=1)
+
+    # The cursors of the pages visited so far; the last one is the current page.
+    # Changing the sort or page size starts again from the first page.
+    view = (sort, descending, page_size)
+    if st.session_state.get('list_view') != view:
+        st.session_state.list_view = view
+        st.session_state.list_cursors = [None]
+    cursors = st.session_state.list_cursors
+
+    page = list_profiles(page_size=page_size, sort=sort, descending=descending, after=cursors[-1])
+
+    if page['rows']:
+        st.caption(f"Page {len(cursors)} · about {approximate_profile_count():,} profiles in the database"
+                   + (" · profiles without an email are only listed when sorting by date added" if sort == "email" else ""))
+        st.table(page['rows'])
     else:
-        st.info("No professors found in the database.")
\ No newline at end of file
+        st.info("No professors found in the database.")
+
+    col_prev, _, col_next = st.columns([1, 4, 1])
+    if col_prev.button("← Previous", disabled=len(cursors) == 1, use_container_width=True):
+        cursors.pop()
+        st.rerun()
+    if col_next.button("Next →", disabled=page['next_cursor'] is None, use_container_width=True):
+        cursors.append(page['next_cursor'])
+        st.rerun()
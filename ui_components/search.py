@@ -1,9 +1,7 @@
-
 import streamlit as st
-from services.database import check_if_profile_exists
+from services.database import check_if_profile_exists, search_profiles, SEARCH_PAGE_SIZE
 
-def render_search():
-    st.header("Search Profiles")
+def render_email_search():
     search_email = st.text_input("Enter email to search")
     if st.button("Search by Email"):
         if search_email.strip():
@@ -14,4 +12,56 @@ def render_search():
             else:
                 st.warning(f"No profile found with email: {search_email}")
         else:
-            st.error("Please enter a valid email.")
\ No newline at end of file
+            st.error("Please enter a valid email.")
+
+def render_profile_search():
+    with st.form("profile_search"):
+        col_left, col_right = st.columns(2)
+        name = col_left.text_input("Name contains")
+        text = col_right.text_input("Keywords in name or summary", help="e.g. machine learning -sales")
+        skills = col_left.text_input("Skills (comma-separated, all must match)")
+        company = col_right.text_input("Worked at company")
+        institution = col_left.text_input("Studied at institution")
+        submitted = st.form_submit_button("Search Profiles")
+
+    if submitted:
+        st.session_state.search_filters = {
+            "name": name, "text": text, "company": company, "institution": institution,
+            "skills": [s.strip() for s in skills.split(",") if s.strip()],
+        }
+        st.session_state.search_offset = 0
+
+    filters = st.session_state.get('search_filters')
+    if not filters:
+        return
+    offset = st.session_state.get('search_offset', 0)
+    result = search_profiles(**filters, limit=SEARCH_PAGE_SIZE, offset=offset)
+
+    if not result['rows']:
+        st.warning("No profiles match these filters." if offset == 0 else "No more results.")
+    else:
+        st.success(f"Showing results {offset + 1}–{offset + len(result['rows'])}, best matches first.")
+        st.dataframe(
+            [{k: row[k] for k in ("name", "email", "top_area_of_expertise", "summary")} for row in result['rows']],
+            use_container_width=True,
+        )
+        selected = st.selectbox("Show full profile", [row['email'] for row in result['rows'] if row['email']],
+                                index=None, placeholder="Choose a profile")
+        if selected:
+            st.json(check_if_profile_exists.invoke({"email": selected})['profile'])
+
+    col_prev, _, col_next = st.columns([1, 4, 1])
+    if col_prev.button("← Previous", disabled=offset == 0, use_container_width=True):
+        st.session_state.search_offset = max(0, offset - SEARCH_PAGE_SIZE)
+        st.rerun()
+    if col_next.button("Next →", disabled=not result['has_more'], use_container_width=True):
+        st.session_state.search_offset = offset + SEARCH_PAGE_SIZE
+        st.rerun()
+
+def render_search():
+    st.header("Search Profiles")
+    by_email, by_profile = st.tabs(["By email", "By name, skills, employer or institution"])
+    with by_email:
+        render_email_search()
+    with by_profile:
+        render_profile_search()
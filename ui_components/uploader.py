@@ -1,56 +1,110 @@
 
 import streamlit as st
-from services.file_parser import get_file_text
-from graph.state import GraphState
-
-def render_uploader(graph_app):
-    """Renders the uploader and processes the file using a clean status UI."""
-    uploaded_file = st.file_uploader("Choose a file", type=["pdf", "docx", "txt"])
-
-    if uploaded_file:
-        st.session_state.status_messages = []
-        final_state = None  # Initialize to ensure variable is available outside the with block
-
-        # Use st.status to show the process steps. This container will be collapsed.
-        with st.status("Processing resume...", expanded=True) as status:
-            try:
-                file_text = get_file_text(uploaded_file)
-                
-                if not file_text.strip():
-                    status.update(label="Failed to extract text from file.", state="error", expanded=False)
-                    return
-
-                # Run the graph and get the final state
-                initial_state = GraphState(file_content=file_text)
-                final_state = graph_app.invoke(initial_state)
-
-                # Display the completed steps inside the status box before it collapses
-                for msg in st.session_state.status_messages:
-                    st.write(f"✔️ {msg}")
-
-                # Determine the final state of the status box
-                final_label = final_state.get('final_message', "Processing complete.")
-                final_status_state = "complete"
-                
-                if final_state.get('is_resume') == False or final_state.get('profile_exists_in_db'):
-                    final_status_state = "error"
-                
-                # Update and collapse the status box
-                status.update(label=final_label, state=final_status_state, expanded=False)
-
-            except Exception as e:
-                status.update(label=f"An unexpected error occurred: {e}", state="error", expanded=False)
-
-        # --- Display the Final Result (OUTSIDE the status block) ---
-        # This code runs after the 'with' block has finished and the status box is collapsed.
-        # It ensures the final JSON data is always visible.
-        if final_state:
-            if final_state.get('is_resume') == False:
-                # The warning is already shown in the collapsed status box, so we don't need to do anything here.
-                pass
-            elif final_state.get('profile_exists_in_db'):
-                st.info("Displaying existing profile from the database:")
-                st.json(final_state['existing_profile_data'])
-            elif final_state.get('profile_data'):
-                st.success("Extracted Profile Data:")
-                st.json(final_state['profile_data'])
\ No newline at end of file
+from services import job_queue
+from graph.runner import start_worker_pool, JOB_EMBEDDED_WORKERS
+
+# How often the job list refreshes while any of this session's jobs is unfinished.
+JOB_REFRESH_SECONDS = 1.0
+
+def _submit_uploads(uploaded_files):
+    """Queues every newly uploaded file once; Streamlit hands the same files back on each rerun."""
+    submitted = st.session_state.submitted_uploads
+    for uploaded_file in uploaded_files:
+        if uploaded_file.file_id in submitted:
+            continue
+        job_id = job_queue.submit_job(uploaded_file.name, uploaded_file.getvalue())
+        st.session_state.upload_jobs.append(job_id)
+        submitted.add(uploaded_file.file_id)
+
+def _job_progress(job_id: str, attempt: int) -> dict:
+    """
+    Returns the progress messages and the partially extracted profile of a job,
+    fetching only the events added since the last refresh. A re-queued job's events
+    are replaced by those of its next attempt, so the cache restarts with each attempt.
+    """
+    seen = st.session_state.job_events.get(job_id)
+    if seen is None or seen["attempt"] != attempt:
+        seen = {"attempt": attempt, "last_id": 0, "messages": [], "profile": {}}
+        st.session_state.job_events[job_id] = seen
+    for event_id, event in job_queue.get_events(job_id, seen["last_id"]):
+        seen["last_id"] = event_id
+        if event["type"] == "status":
+            seen["messages"].append(event["message"])
+        elif event["type"] == "parsed":
+            note = (f"Parsed {event['pages_parsed']} of {event['page_count']} pages" if event['page_count']
+                    else "Parsed file")
+            seen["messages"].append(f"{note} in {event['seconds']:.2f}s"
+                                    + (" (stopped early at the size limit)." if event['truncated'] else "."))
+        elif event["type"] == "profile_field":
+            seen["profile"][event["field"]] = event["value"]
+        elif event["type"] == "profile_item":
+            seen["profile"].setdefault(event["field"], []).append(event["value"])
+    return seen
+
+def _render_job(job: dict):
+    result = job["result"] or {}
+    if job["status"] == job_queue.QUEUED:
+        label, state = f"{job['file_name']}: waiting for a worker...", "running"
+    elif job["status"] == job_queue.RUNNING:
+        label, state = f"{job['file_name']}: processing...", "running"
+    elif job["status"] == job_queue.FAILED:
+        label, state = f"{job['file_name']}: an unexpected error occurred: {job['error']}", "error"
+    else:
+        label = f"{job['file_name']}: {result.get('final_message', 'Processing complete.')}"
+        state = "complete" if result.get("outcome") in ("inserted", "updated", "queued") else "error"
+
+    progress = _job_progress(job["id"], job["attempts"])
+    # Use st.status to show the process steps. The container collapses once the job is finished.
+    with st.status(label, state=state, expanded=state == "running"):
+        for msg in progress["messages"]:
+            st.write(f"✔️ {msg}")
+        metrics = result.get("metrics")
+        if metrics:
+            st.caption(f"Pipeline time {metrics['seconds']:.2f}s, {metrics['tokens']} LLM tokens: "
+                       + ", ".join(f"{node} {seconds:.2f}s" for node, seconds in metrics['nodes'].items()))
+
+    # --- Display the Final Result (OUTSIDE the status block) ---
+    if job["status"] == job_queue.RUNNING and progress["profile"]:
+        # Fields and entries appear as the model streams them; the final result replaces them.
+        st.info("Extracting profile data...")
+        st.json(progress["profile"])
+    elif result.get("is_resume") == False:
+        # The warning is already shown in the collapsed status box.
+        pass
+    elif result.get("profile_exists_in_db"):
+        st.info("Displaying existing profile from the database:")
+        st.json(result["existing_profile_data"], expanded=False)
+    elif result.get("profile_data"):
+        st.success("Extracted Profile Data:")
+        st.json(result["profile_data"], expanded=False)
+
+def _render_jobs(polling: bool):
+    """Renders this session's jobs; runs as a fragment so refreshes do not rerun the whole page."""
+    jobs = job_queue.get_jobs(st.session_state.upload_jobs)
+    for job_id in reversed(st.session_state.upload_jobs):
+        if job_id in jobs:
+            _render_job(jobs[job_id])
+    if polling and all(job["status"] in job_queue.FINISHED_STATUSES for job in jobs.values()):
+        st.rerun()  # Everything finished: rerun the page once so the fragment stops refreshing
+
+def render_uploader():
+    """Renders the uploader, queues uploaded files for the background workers and shows their progress."""
+    if JOB_EMBEDDED_WORKERS:
+        start_worker_pool(JOB_EMBEDDED_WORKERS)
+    st.session_state.setdefault('upload_jobs', [])
+    st.session_state.setdefault('submitted_uploads', set())
+    st.session_state.setdefault('job_events', {})
+
+    uploaded_files = st.file_uploader("Choose files", type=["pdf", "docx", "txt"], accept_multiple_files=True)
+    if uploaded_files:
+        _submit_uploads(uploaded_files)
+
+    if not st.session_state.upload_jobs:
+        return
+    jobs = job_queue.get_jobs(st.session_state.upload_jobs)
+    pending = any(job["status"] not in job_queue.FINISHED_STATUSES for job in jobs.values())
+    if not pending and st.button("Clear finished"):
+        st.session_state.upload_jobs = []
+        st.session_state.job_events = {}
+        st.rerun()
+    st.fragment(_render_jobs, run_every=JOB_REFRESH_SECONDS if pending else None)(pending)
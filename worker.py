@@ -0,0 +1,49 @@
+"""
+Standalone worker for the upload job queue.
+
+Usage:
+    uv run python worker.py --workers 8
+
+Processes documents submitted through the Streamlit uploader. Run it on the same
+machine as the app (the queue is the SQLite file at JOB_QUEUE_PATH) and set
+JOB_EMBEDDED_WORKERS=0 for the app if all processing should happen here.
+"""
+import sys
+import time
+import signal
+import logging
+import argparse
+from dotenv import load_dotenv
+load_dotenv()
+
+from services.job_queue import queue_depth
+from graph.runner import JobWorkerPool, JOB_WORKERS, JOB_POLL_INTERVAL_SECONDS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process queued resume uploads.")
+    parser.add_argument("--workers", type=int, default=JOB_WORKERS, help="Documents processed at once.")
+    parser.add_argument("--poll-interval", type=float, default=JOB_POLL_INTERVAL_SECONDS,
+                        help="Seconds an idle worker waits before checking the queue again.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    from graph.graph import get_app
+    get_app()  # Compile up front so a broken setup fails here rather than on the first job
+
+    pool = JobWorkerPool(workers=max(1, args.workers), poll_interval=args.poll_interval).start()
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    print(f"Worker started with {pool.workers} threads; queue: {queue_depth()}", file=sys.stderr)
+    try:
+        while not stopping:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    print("Stopping after the jobs in progress...", file=sys.stderr)
+    pool.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())